@@ -0,0 +1,127 @@
+"""Benchmark both connectors against the local fake servers.
+
+Runs APIConnector.update() for a region served by both connectors and for a
+Nord Pool only region under a set of fault scenarios, reporting latency and
+whether usable prices were returned.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_connectors
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from statistics import median, quantiles
+import tempfile
+from time import perf_counter
+
+from custom_components.energidataservice.const import DATA_HISTORY, DATA_RETRY, DOMAIN
+from custom_components.energidataservice.utils.http_cache import RESPONSE_CACHE
+from custom_components.energidataservice.utils.session import (
+    SessionLimits,
+    create_session,
+)
+
+from .fake_server import FakeServer, Faults
+from .harness import FakeHass, create_api, create_entry, patch_timers, setup_domain
+
+SCENARIOS = {
+    "healthy": Faults(),
+    "latency": Faults(latency=0.05, jitter=0.05),
+    "slow_body": Faults(slow_body=0.2),
+    "partial_day": Faults(partial_hours=6),
+    "errors_20%": Faults(status=503, error_rate=0.2),
+    "bad_request": Faults(status=400),
+    "disconnect_20%": Faults(disconnect_rate=0.2),
+}
+
+REGIONS = ("DK1", "FI")
+
+
+async def run_scenario(
+    server: FakeServer, name: str, rounds: int, config_dir: str
+) -> list:
+    """Run one scenario for all regions and return result rows.
+
+    Exceptions escaping update() are counted, since Home Assistant would
+    log them from the sensor instead of scheduling a retry.
+    """
+    server.faults = {"eds": SCENARIOS[name], "nordpool": SCENARIOS[name]}
+    rows = []
+    for region in REGIONS:
+        hass = FakeHass(config_dir)
+        session = create_session(SessionLimits(total_timeout=10))
+        setup_domain(hass, session)
+        api = create_api(hass, create_entry(f"{name}_{region}", region))
+
+        times = []
+        ok = raised = 0
+        try:
+            for _ in range(rounds):
+                RESPONSE_CACHE.clear()
+                api.today = api.tomorrow = None
+                start = perf_counter()
+                try:
+                    await api.update()
+                except Exception:  # pylint: disable=broad-except
+                    raised += 1
+                times.append(perf_counter() - start)
+                ok += bool(api.today)
+                # Only the update itself is measured, not scheduled retries
+                hass.data[DOMAIN][DATA_RETRY].cancel_all()
+        finally:
+            await session.close()
+            hass.data[DOMAIN][DATA_HISTORY].close()
+
+        rows.append(
+            (
+                name,
+                region,
+                median(times) * 1000,
+                quantiles(times, n=20)[-1] * 1000 if len(times) > 1 else times[0],
+                ok / rounds * 100,
+                raised,
+                api.tomorrow_valid,
+            )
+        )
+
+    return rows
+
+
+async def run(rounds: int, scenarios: list) -> None:
+    """Run all scenarios against a fresh server."""
+    async with FakeServer(seed=1) as server:
+        with server.patch_connectors(), patch_timers(), tempfile.TemporaryDirectory() as config_dir:
+            print(
+                f"{'scenario':<16}{'region':<8}{'p50 ms':>10}{'p95 ms':>10}"
+                f"{'ok %':>8}{'raised':>8}{'tomorrow':>10}"
+            )
+            for name in scenarios:
+                for row in await run_scenario(server, name, rounds, config_dir):
+                    print(
+                        f"{row[0]:<16}{row[1]:<8}{row[2]:>10.1f}{row[3]:>10.1f}"
+                        f"{row[4]:>8.0f}{row[5]:>8}{str(row[6]):>10}"
+                    )
+
+        print(dict(sorted(server.stats.items())))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument(
+        "--scenario", action="append", choices=list(SCENARIOS), dest="scenarios"
+    )
+    parser.add_argument("--verbose", action="store_true", help="show integration logs")
+    args = parser.parse_args()
+    if not args.verbose:
+        logging.getLogger("custom_components").setLevel(logging.CRITICAL)
+
+    asyncio.run(run(args.rounds, args.scenarios or list(SCENARIOS)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark decoding of recorded upstream payloads.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_decode
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+import tracemalloc
+
+from custom_components.energidataservice.connectors.nordpool import (
+    Connector as NordpoolConnector,
+    slim_page,
+)
+from custom_components.energidataservice.utils import decoding
+from custom_components.energidataservice.utils.regionhandler import RegionHandler
+
+DATASET = Path(__file__).parent.parent / "test_dataset"
+PAYLOADS = {
+    "energidataservice": DATASET / "20220325.json",
+    "nordpool": DATASET / "nordpool_20220325.json",
+}
+
+
+def _decoders() -> dict:
+    """Return available decoders."""
+    decoders = {"json": json.loads}
+    if decoding.BACKEND != "json":
+        decoders[decoding.BACKEND] = decoding.loads
+
+    return decoders
+
+
+def measure(func, rounds: int) -> tuple:
+    """Return median time in ms and peak memory in KiB of func."""
+    times = []
+    for _ in range(rounds):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return median(times) * 1000, peak / 1024
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'payload':<20}{'step':<28}{'median ms':>12}{'peak KiB':>12}")
+    for name, path in PAYLOADS.items():
+        body = path.read_bytes()
+        for backend, loads in _decoders().items():
+            elapsed, peak = measure(lambda: loads(body), args.rounds)
+            print(f"{name:<20}{'decode ' + backend:<28}{elapsed:>12.3f}{peak:>12.1f}")
+
+        if name == "nordpool":
+            connector = NordpoolConnector(
+                RegionHandler("DK1"), None, "Europe/Copenhagen"
+            )
+            full = json.loads(body)
+            slim = slim_page(full)
+            for label, page in (
+                ("parse full document", full),
+                ("parse slim document", slim),
+            ):
+                elapsed, peak = measure(
+                    lambda page=page: connector._parse_json(
+                        page
+                    ),  # pylint: disable=protected-access
+                    args.rounds,
+                )
+                print(f"{name:<20}{label:<28}{elapsed:>12.3f}{peak:>12.1f}")
+
+            elapsed, peak = measure(
+                lambda: slim_page(decoding.loads(body)), args.rounds
+            )
+            print(f"{name:<20}{'decode + slim':<28}{elapsed:>12.3f}{peak:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark the startup cost of the integration.
+
+Runs a fresh interpreter with ``python -X importtime``, preloading what Home
+Assistant has already imported before the integration loads, and reports the
+import time attributed to the integration and the packages it pulls in. Also
+times setting up a RegionHandler, which used to load currency rates.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_import
+"""
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+import subprocess
+import sys
+
+INTEGRATION = "custom_components.energidataservice"
+
+# Modules already imported by a running Home Assistant instance
+PRELOAD = (
+    "asyncio",
+    "aiohttp",
+    "jinja2",
+    "voluptuous",
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.template",
+    "homeassistant.components.sensor",
+)
+
+MODULES = (
+    INTEGRATION,
+    f"{INTEGRATION}.sensor",
+    f"{INTEGRATION}.config_flow",
+)
+
+SCRIPT = """
+import importlib, sys, time
+for name in {preload!r}:
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        pass
+print("--- integration ---", file=sys.stderr, flush=True)
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+imported = time.perf_counter() - start
+from {integration}.utils.regionhandler import RegionHandler
+start = time.perf_counter()
+RegionHandler("DK1")
+print(f"{{imported}} {{time.perf_counter() - start}}")
+"""
+
+
+def run_once() -> tuple:
+    """Run a fresh interpreter and return per package import time and totals."""
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            SCRIPT.format(preload=PRELOAD, modules=MODULES, integration=INTEGRATION),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages = defaultdict(int)
+    started = False
+    for line in proc.stderr.splitlines():
+        if line.startswith("--- integration ---"):
+            started = True
+            continue
+        if not started or not line.startswith("import time:"):
+            continue
+
+        fields = line.split("|")
+        if not fields[0].split(":")[1].strip().isdigit():
+            continue
+
+        name = fields[2].strip()
+        package = INTEGRATION if name.startswith(INTEGRATION) else name.split(".")[0]
+        packages[package] += int(fields[0].split(":")[1])
+
+    imported, region = (float(value) for value in proc.stdout.split())
+    return packages, imported, region
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.rounds)]
+    packages = defaultdict(list)
+    for run in runs:
+        for package, micros in run[0].items():
+            packages[package].append(micros)
+
+    print(f"{'package':<40}{'self ms (min)':>14}")
+    ranked = sorted(packages.items(), key=lambda item: -min(item[1]))
+    for package, micros in ranked[: args.top]:
+        print(f"{package:<40}{min(micros) / 1000:>14.2f}")
+
+    print(f"{'import wall time ms (min)':<40}{min(r[1] for r in runs) * 1000:>14.2f}")
+    print(
+        f"{'first RegionHandler ms (min)':<40}{min(r[2] for r in runs) * 1000:>14.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Simulate hundreds of config entries on a simulated clock.
+
+Sets the integration up with N entries spread over all regions, with mixed
+templates and options, against the local fake servers. A simulated clock then
+drives the interval ticks, the publication window around 13:00, midnight and
+a DST transition day. Reported per phase:
+
+- CPU time of the process
+- event loop lag (real time)
+- executor queue depth
+- upstream requests
+- dispatcher calls
+- state writes and their JSON size, i.e. what the recorder would store
+
+Run from the repository root:
+
+    python -m benchmarks.bench_load --entries 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from itertools import cycle
+import logging
+import tempfile
+from time import perf_counter, process_time
+
+from custom_components import energidataservice as integration
+import pytz
+
+from custom_components.energidataservice.connectors import Connectors
+from custom_components.energidataservice.const import (
+    CONF_CURRENCY_IN_CENT,
+    CONF_DECIMALS,
+    CONF_HEDGE_DELAY,
+    CONF_VAT,
+    REGIONS,
+)
+
+from .fake_server import FakeServer, Faults
+from .fixtures import TEMPLATES
+from .harness import TZ, Dispatcher, FakeHass, SimClock, create_entry, patch_integration
+
+# Tomorrows prices are served from this local time on
+PUBLICATION = time(13, 0)
+
+PHASES = ("boot", "midnight", "13:xx", "hourly", "quarter", "idle")
+
+# Real seconds between event loop lag samples
+LAG_INTERVAL = 0.005
+
+
+def dst_start(year: int) -> date:
+    """Return the last Sunday of March, when EU clocks go forward."""
+    day = date(year, 3, 31)
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+def phase_of(local: datetime) -> str:
+    """Return the phase a simulated minute belongs to."""
+    if local.hour == 0 and local.minute == 0:
+        return "midnight"
+    if local.hour == 13 or (local.hour == 12 and local.minute >= 40):
+        return "13:xx"
+    if local.minute == 0:
+        return "hourly"
+    if local.minute % 15 == 0:
+        return "quarter"
+    return "idle"
+
+
+def create_entries(count: int) -> list:
+    """Return entries spread over all regions served by a connector."""
+    served = set()
+    for connector in Connectors().connectors:
+        served.update(connector.regions)
+
+    regions = cycle(sorted(region for region in REGIONS if region in served))
+    templates = cycle(TEMPLATES.values())
+    price_types = cycle(("kWh", "kWh", "MWh", "Wh"))
+    entries = []
+    for idx in range(count):
+        entries.append(
+            create_entry(
+                f"entry_{idx:04d}",
+                next(regions),
+                next(templates),
+                next(price_types),
+                **{
+                    CONF_CURRENCY_IN_CENT: idx % 3 == 0,
+                    CONF_VAT: idx % 2 == 0,
+                    CONF_DECIMALS: 2 + idx % 3,
+                    CONF_HEDGE_DELAY: 2.0 if idx % 5 == 0 else 0,
+                },
+            )
+        )
+
+    return entries
+
+
+class Monitor:
+    """Collect metrics per phase."""
+
+    def __init__(self, hass: FakeHass, server: FakeServer, dispatcher: Dispatcher):
+        """Initialize the monitor."""
+        self._hass = hass
+        self._server = server
+        self._dispatcher = dispatcher
+        self.phase = "boot"
+        self.totals = defaultdict(lambda: defaultdict(float))
+        self.lags = defaultdict(list)
+        self._task = None
+
+    def _counters(self) -> dict:
+        """Return current values of cumulative counters."""
+        stats = self._server.stats
+        return {
+            "cpu_s": process_time(),
+            "wall_s": perf_counter(),
+            "requests": stats["eds.requests"] + stats["nordpool.requests"],
+            "dispatch_calls": self._dispatcher.calls,
+            "state_writes": self._hass.state_writes,
+            "state_kb": self._hass.state_bytes / 1024,
+        }
+
+    async def measure(self, phase: str, coro) -> None:
+        """Run coro, adding counter deltas to phase."""
+        self.phase = phase
+        before = self._counters()
+        await coro
+        after = self._counters()
+        totals = self.totals[phase]
+        totals["count"] += 1
+        for key, value in after.items():
+            totals[key] += value - before[key]
+
+    async def _sample(self) -> None:
+        """Sample event loop lag and executor queue depth."""
+        executor = self._hass.executor
+        while True:
+            start = perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            lag = perf_counter() - start - LAG_INTERVAL
+            self.lags[self.phase].append(lag)
+            depth = executor._work_queue.qsize()  # pylint: disable=protected-access
+            totals = self.totals[self.phase]
+            totals["queue_max"] = max(totals["queue_max"], depth)
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._task.cancel()
+
+    def report(self) -> None:
+        """Print metrics per phase."""
+        columns = (
+            "count",
+            "cpu_s",
+            "wall_s",
+            "requests",
+            "dispatch_calls",
+            "state_writes",
+            "state_kb",
+            "queue_max",
+        )
+        print(
+            f"{'phase':<10}"
+            + "".join(f"{column:>15}" for column in columns)
+            + f"{'lag_p99_ms':>12}{'lag_max_ms':>12}"
+        )
+        for phase in PHASES:
+            if phase not in self.totals:
+                continue
+            totals = self.totals[phase]
+            lags = sorted(self.lags[phase]) or [0]
+            p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+            print(
+                f"{phase:<10}"
+                + "".join(f"{totals[column]:>15.2f}" for column in columns)
+                + f"{p99 * 1000:>12.1f}{lags[-1] * 1000:>12.1f}"
+            )
+
+
+async def run(args) -> None:
+    """Set up the entries and run the simulation."""
+    start_day = args.date or dst_start(date.today().year) - timedelta(days=1)
+    clock = SimClock(
+        pytz.timezone(TZ).localize(datetime.combine(start_day, args.start))
+    )
+
+    server = FakeServer(seed=1, today=lambda: clock.local.date())
+    faults = Faults(latency=args.latency, jitter=args.latency)
+
+    def publish(now=None) -> None:  # pylint: disable=unused-argument
+        """Serve tomorrows prices only after the publication time."""
+        published = clock.local.time() >= PUBLICATION
+        partial = faults if published else faults._replace(partial_hours=0)
+        server.faults = {"eds": partial, "nordpool": partial}
+
+    executor = ThreadPoolExecutor(args.workers)
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with server:
+            hass = FakeHass(config_dir, TZ, executor)
+            dispatcher = Dispatcher(hass)
+            monitor = Monitor(hass, server, dispatcher)
+            with server.patch_connectors(), patch_integration(hass, clock, dispatcher):
+                publish()
+                clock.track_time_change(hass, publish, second=0)
+                monitor.start()
+
+                async def boot():
+                    await integration.async_setup(hass, {})
+                    for entry in create_entries(args.entries):
+                        await integration.async_setup_entry(hass, entry)
+                    await hass.async_settle()
+                    # Let the coordinator's settle timer fire
+                    await clock.async_advance(hass, 5)
+
+                await monitor.measure("boot", boot())
+                with_state = sum(1 for entity in hass.entities if entity.state)
+                print(
+                    f"{args.entries} entries, {with_state} with a state after boot, "
+                    f"simulating from {clock.local:%Y-%m-%d %H:%M} for {args.days} days"
+                )
+
+                for _ in range(int(args.days * 24 * 60)):
+                    await monitor.measure(
+                        phase_of(clock.local + timedelta(minutes=1)),
+                        clock.async_advance(hass, 60),
+                    )
+
+                monitor.stop()
+                await hass.async_stop()
+
+    executor.shutdown()
+    monitor.report()
+    print(dict(sorted(server.stats.items())))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200)
+    parser.add_argument("--days", type=float, default=2)
+    parser.add_argument(
+        "--date",
+        type=date.fromisoformat,
+        help="first simulated day (default: the day before DST starts)",
+    )
+    parser.add_argument(
+        "--start",
+        type=time.fromisoformat,
+        default=time(11, 0),
+        help="local start time",
+    )
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--verbose", action="store_true", help="show integration logs")
+    args = parser.parse_args()
+    if not args.verbose:
+        logging.getLogger("custom_components").setLevel(logging.CRITICAL)
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
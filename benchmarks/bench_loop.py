@@ -0,0 +1,139 @@
+"""Measure event loop latency while sensors format prices under load.
+
+Sets up N entries with mixed templates against a stub client, then keeps
+the shared executor busy with blocking jobs, as other integrations do, and
+has every sensor format today and tomorrow again at once, like after
+midnight or the publication of tomorrow's prices. Reported:
+
+- time until all sensors have written their state (p50 and max per round)
+- event loop lag over all rounds (p99 and max)
+- executor jobs started by the integration
+
+Run from the repository root:
+
+    python -m benchmarks.bench_loop --entries 100 --busy 8
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from itertools import cycle
+import tempfile
+import time
+from time import perf_counter
+
+from custom_components.energidataservice.const import DATA_HISTORY, DOMAIN
+
+from .fixtures import TEMPLATES, StubClient
+from .harness import TZ, FakeHass, create_api, create_entry, create_sensor, setup_domain
+
+# Real seconds between event loop lag samples
+LAG_INTERVAL = 0.001
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Return the value at fraction of the sorted values."""
+    values = sorted(values) or [0]
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def sample_lag(lags: list) -> None:
+    """Append event loop lag samples to lags until cancelled."""
+    while True:
+        start = perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append(perf_counter() - start - LAG_INTERVAL)
+
+
+async def keep_busy(executor, jobs: int, seconds: float) -> None:
+    """Keep jobs blocking calls of seconds each queued in executor."""
+    loop = asyncio.get_running_loop()
+
+    async def worker():
+        while True:
+            await loop.run_in_executor(executor, time.sleep, seconds)
+
+    await asyncio.gather(*(worker() for _ in range(jobs)))
+
+
+async def run(args, config_dir: str) -> None:
+    """Set up the entries and measure rounds of formatting."""
+    executor = ThreadPoolExecutor(args.workers)
+    hass = FakeHass(config_dir, TZ, executor)
+    setup_domain(hass, StubClient(date.today()))
+
+    jobs = 0
+    add_executor_job = hass.async_add_executor_job
+
+    def counted_job(target, *job_args):
+        nonlocal jobs
+        jobs += 1
+        return add_executor_job(target, *job_args)
+
+    hass.async_add_executor_job = counted_job
+
+    pairs = []
+    templates = cycle(TEMPLATES.values())
+    regions = cycle(("DK1", "FI"))
+    for index in range(args.entries):
+        entry = create_entry(f"loop_{index}", next(regions), next(templates))
+        api = create_api(hass, entry)
+        await api.update()
+        pairs.append((api, create_sensor(hass, entry), api.today, api.tomorrow))
+
+    # Warm up, so templates are compiled like at setup in Home Assistant
+    for _, sensor, _, _ in pairs:
+        await sensor.validate_data()
+
+    busy = asyncio.create_task(keep_busy(executor, args.busy, args.job_ms / 1000))
+    walls, lags = [], []
+    sampler = asyncio.create_task(sample_lag(lags))
+    jobs = 0
+    for _ in range(args.rounds):
+        for api, _, today, tomorrow in pairs:
+            api.today, api.tomorrow = today, tomorrow
+            api.today_calculated = api.tomorrow_calculated = False
+
+        start = perf_counter()
+        await asyncio.gather(*(sensor.validate_data() for _, sensor, _, _ in pairs))
+        walls.append(perf_counter() - start)
+        await asyncio.sleep(args.job_ms / 1000)
+
+    sampler.cancel()
+    busy.cancel()
+    executor.shutdown(cancel_futures=True)
+    hass.data[DOMAIN][DATA_HISTORY].close()
+
+    print(
+        f"{args.entries} entries, {args.busy} blocking jobs of {args.job_ms} ms "
+        f"on {args.workers} executor threads, {args.rounds} rounds"
+    )
+    print(
+        f"{'update p50 ms':>15}{'update max ms':>15}{'lag p99 ms':>12}"
+        f"{'lag max ms':>12}{'jobs/round':>12}"
+    )
+    print(
+        f"{percentile(walls, 0.5) * 1000:>15.1f}{max(walls) * 1000:>15.1f}"
+        f"{percentile(lags, 0.99) * 1000:>12.2f}{max(lags or [0]) * 1000:>12.2f}"
+        f"{jobs / args.rounds:>12.0f}"
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4, help="executor threads")
+    parser.add_argument("--busy", type=int, default=8, help="blocking jobs queued")
+    parser.add_argument("--job-ms", type=float, default=20, help="length of a job")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        asyncio.run(run(args, config_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Benchmark the fetch, parse, format and publish path end to end.
+
+Uses the recorded payloads in test_dataset/ for both connectors, served by a
+stub client. Results can be saved per commit and compared against an earlier
+run, so regressions in the hot paths show up.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline --save
+    python -m benchmarks.bench_pipeline --compare <commit>
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import date
+import json
+from pathlib import Path
+import platform
+from statistics import median
+import subprocess
+import tempfile
+from time import perf_counter
+
+from homeassistant.helpers.json import JSONEncoder
+
+from custom_components.energidataservice.connectors.energidataservice import (
+    prepare_data,
+)
+from custom_components.energidataservice.connectors.nordpool import (
+    Connector as NordpoolConnector,
+    slim_page,
+)
+from custom_components.energidataservice.const import DATA_HISTORY, DOMAIN
+from custom_components.energidataservice.utils.http_cache import RESPONSE_CACHE
+from custom_components.energidataservice.utils.regionhandler import RegionHandler
+
+from .fixtures import TEMPLATES, StubClient, eds_rows, nordpool_page
+from .harness import TZ, FakeHass, create_api, create_entry, create_sensor, setup_domain
+
+RESULTS = Path(__file__).parent / "results"
+
+
+def measure(func, rounds: int) -> float:
+    """Return median time of func in microseconds."""
+    times = []
+    for _ in range(rounds):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+
+    return median(times) * 1e6
+
+
+async def async_measure(func, rounds: int) -> float:
+    """Return median time of the coroutine function func in microseconds."""
+    times = []
+    for _ in range(rounds):
+        start = perf_counter()
+        await func()
+        times.append(perf_counter() - start)
+
+    return median(times) * 1e6
+
+
+async def run(rounds: int, config_dir: str) -> dict:
+    """Run all benchmarks and return median times in microseconds."""
+    results = {}
+    today = date.today()
+
+    page = slim_page(nordpool_page(today))
+    nordpool = NordpoolConnector(RegionHandler("DK1"), None, TZ)
+    parse_json = nordpool._parse_json  # pylint: disable=protected-access
+    results["nordpool._parse_json"] = measure(lambda: parse_json(page), rounds)
+
+    rows = eds_rows(today=today)
+    results["energidataservice.prepare_data"] = measure(
+        lambda: prepare_data(rows, today.isoformat(), TZ), rounds
+    )
+
+    hass = FakeHass(config_dir)
+    client = StubClient(today)
+    setup_domain(hass, client)
+
+    for region in ("DK1", "FI"):
+        api = create_api(hass, create_entry(f"update_{region}", region))
+
+        async def update(api=api):
+            RESPONSE_CACHE.clear()
+            await api.update()
+
+        results[f"APIConnector.update[{region}]"] = await async_measure(
+            update, max(rounds // 10, 10)
+        )
+        results[f"APIConnector.update[{region},unchanged]"] = await async_measure(
+            api.update, max(rounds // 10, 10)
+        )
+
+    for name, template in TEMPLATES.items():
+        entry = create_entry(f"format_{name}", template=template)
+        api = create_api(hass, entry)
+        await api.update()
+        raw = api.today
+        sensor = create_sensor(hass, entry)
+        format_ = sensor._async_format  # pylint: disable=protected-access
+        results[f"sensor._async_format[{name}]"] = await async_measure(
+            lambda format_=format_, raw=raw: format_(raw),
+            max(rounds // 10, 10),
+        )
+
+    # Attributes of a fully populated sensor
+    await sensor.validate_data()
+    get_specific = sensor._get_specific  # pylint: disable=protected-access
+    results["sensor._get_specific"] = measure(
+        lambda: [get_specific(kind, api.today) for kind in ("min", "max", "mean")],
+        rounds,
+    )
+    results["sensor.extra_state_attributes"] = measure(
+        lambda: json.dumps(sensor.extra_state_attributes, cls=JSONEncoder), rounds
+    )
+
+    hass.data[DOMAIN][DATA_HISTORY].close()
+
+    return results
+
+
+def commit() -> str:
+    """Return the current commit, marked dirty if the tree has changes."""
+    return subprocess.run(
+        ["git", "describe", "--always", "--dirty"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+
+def load(ref: str) -> dict:
+    """Load saved results for a commit (prefix) or a file path."""
+    path = Path(ref)
+    if not path.is_file():
+        matches = sorted(RESULTS.glob(f"{ref}*.json"))
+        if not matches:
+            raise SystemExit(f"No saved results for {ref}")
+        path = matches[-1]
+
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--save", action="store_true", help="save results")
+    parser.add_argument("--compare", metavar="REF", help="commit or results file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        results = asyncio.run(run(args.rounds, config_dir))
+
+    baseline = load(args.compare)["results"] if args.compare else {}
+
+    print(f"{'benchmark':<45}{'median µs':>12}{'change':>10}")
+    for name, value in results.items():
+        change = ""
+        if baseline.get(name):
+            change = f"{(value / baseline[name] - 1) * 100:+.1f}%"
+        print(f"{name:<45}{value:>12.1f}{change:>10}")
+
+    if args.save:
+        ref = commit()
+        RESULTS.mkdir(exist_ok=True)
+        path = RESULTS / f"{ref}.json"
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "commit": ref,
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "rounds": args.rounds,
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+        print(f"Saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
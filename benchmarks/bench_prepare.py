@@ -0,0 +1,81 @@
+"""Benchmark splitting raw rows into local days.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_prepare
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+import json
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+
+import pytz
+
+from custom_components.energidataservice.connectors.energidataservice import (
+    prepare_data,
+)
+from custom_components.energidataservice.const import INTERVAL
+from custom_components.energidataservice.utils.series import split_days
+
+DATASET = Path(__file__).parent.parent / "test_dataset" / "20220325.json"
+TZ = "Europe/Copenhagen"
+
+
+def legacy_prepare_data(indata, date, tz) -> list:  # pylint: disable=invalid-name
+    """Previous implementation, kept as a baseline."""
+    local_tz = pytz.timezone(tz)
+    reslist = []
+    for dataset in indata:
+        tmpdate = (
+            datetime.fromisoformat(dataset["HourUTC"])
+            .replace(tzinfo=pytz.utc)
+            .astimezone(local_tz)
+        )
+        tmp = INTERVAL(dataset["SpotPriceEUR"], local_tz.normalize(tmpdate))
+        if date in tmp.hour.strftime("%Y-%m-%d"):
+            reslist.append(tmp)
+
+    return reslist
+
+
+def measure(func, rounds: int) -> float:
+    """Return median time of func in microseconds."""
+    times = []
+    for _ in range(rounds):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+
+    return median(times) * 1e6
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = json.loads(DATASET.read_bytes())["data"]["elspotprices"]
+    days = ("2022-03-25", "2022-03-26")
+
+    for day in days:
+        assert list(prepare_data(rows, day, TZ)) == legacy_prepare_data(rows, day, TZ)
+
+    cases = {
+        "legacy prepare_data x2": lambda: [
+            legacy_prepare_data(rows, day, TZ) for day in days
+        ],
+        "prepare_data x2": lambda: [prepare_data(rows, day, TZ) for day in days],
+        "split_days": lambda: split_days(rows, TZ),
+    }
+    print(f"{'case':<28}{'median us':>12}")
+    for name, func in cases.items():
+        print(f"{name:<28}{measure(func, args.rounds):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Drive entries from recorded responses on an accelerated clock.
+
+Sets the integration up with N entries answered by a ReplayClient, so no
+network is involved, then moves a simulated clock forward tick by tick,
+e.g. a month of interval updates, publication windows and midnight
+rollovers in seconds. Reported per kind of tick:
+
+- count and total processing time
+- mean, p95 and max processing time (wall and CPU)
+
+Run from the repository root:
+
+    python -m benchmarks.bench_replay --entries 20 --days 30
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+import logging
+import tempfile
+from time import perf_counter, process_time
+
+from custom_components import energidataservice as integration
+import pytz
+
+from custom_components.energidataservice.const import DATA_SESSION, DOMAIN
+
+from .bench_load import create_entries
+from .harness import TZ, Dispatcher, FakeHass, SimClock, patch_integration
+from .replay import ReplayClient, ReplayDataset
+
+KINDS = ("midnight", "fetch", "hourly", "interval")
+
+
+def kind_of(local: datetime, requests: int) -> str:
+    """Return the kind of a tick ending at local time."""
+    if local.hour == 0 and local.minute == 0:
+        return "midnight"
+    if requests:
+        return "fetch"
+    if local.minute == 0:
+        return "hourly"
+    return "interval"
+
+
+def report(costs: dict, simulated: timedelta, elapsed: float) -> None:
+    """Print processing cost per kind of tick."""
+    print(
+        f"{'tick':<10}{'count':>8}{'total s':>10}{'mean ms':>10}"
+        f"{'p95 ms':>10}{'max ms':>10}{'cpu mean ms':>13}"
+    )
+    for kind in KINDS:
+        if kind not in costs:
+            continue
+        walls = sorted(wall for wall, _ in costs[kind])
+        cpus = [cpu for _, cpu in costs[kind]]
+        p95 = walls[min(len(walls) - 1, int(len(walls) * 0.95))]
+        print(
+            f"{kind:<10}{len(walls):>8}{sum(walls):>10.2f}"
+            f"{sum(walls) / len(walls) * 1000:>10.2f}{p95 * 1000:>10.2f}"
+            f"{walls[-1] * 1000:>10.2f}{sum(cpus) / len(cpus) * 1000:>13.2f}"
+        )
+
+    print(
+        f"simulated {simulated} in {elapsed:.1f} s, "
+        f"{simulated.total_seconds() / elapsed:,.0f}x real time"
+    )
+
+
+async def run(args) -> None:
+    """Set up the entries and replay."""
+    dataset = ReplayDataset(args.data)
+    clock = SimClock(
+        pytz.timezone(TZ).localize(datetime.combine(args.date, args.start))
+    )
+    client = ReplayClient(dataset, now=lambda: clock.local.replace(tzinfo=None))
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = FakeHass(config_dir, TZ)
+        dispatcher = Dispatcher(hass)
+        with patch_integration(hass, clock, dispatcher):
+            await integration.async_setup(hass, {})
+            await hass.data[DOMAIN][DATA_SESSION].close()
+            hass.data[DOMAIN][DATA_SESSION] = client
+
+            for entry in create_entries(args.entries):
+                await integration.async_setup_entry(hass, entry)
+            await hass.async_settle()
+            await clock.async_advance(hass, 5)
+
+            costs = defaultdict(list)
+            ticks = int(args.days * 24 * 60 / args.tick)
+            started = perf_counter()
+            for _ in range(ticks):
+                requests = client.requests
+                wall, cpu = perf_counter(), process_time()
+                await clock.async_advance(hass, args.tick * 60)
+                costs[kind_of(clock.local, client.requests - requests)].append(
+                    (perf_counter() - wall, process_time() - cpu)
+                )
+
+            elapsed = perf_counter() - started
+            with_state = sum(1 for entity in hass.entities if entity.state)
+            await hass.async_stop()
+
+    print(
+        f"{args.entries} entries, {with_state} with a state at the end, "
+        f"{len(dataset.eds)} + {len(dataset.nordpool)} recorded days, "
+        f"{client.requests} requests replayed"
+    )
+    report(costs, timedelta(minutes=ticks * args.tick), elapsed)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default="test_dataset", help="recorded responses")
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument(
+        "--tick", type=int, default=15, help="simulated minutes per tick"
+    )
+    parser.add_argument(
+        "--date",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="first simulated day",
+    )
+    parser.add_argument(
+        "--start", type=time.fromisoformat, default=time(0, 0), help="local start time"
+    )
+    parser.add_argument("--verbose", action="store_true", help="show integration logs")
+    args = parser.parse_args()
+    if not args.verbose:
+        logging.getLogger("custom_components").setLevel(logging.CRITICAL)
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Check that a failed fetch leaves formatted prices alone.
+
+Sets up two entries in the same region, fetches and formats once, then
+takes both upstream APIs down and updates the region again, through the
+coordinator like the shared poller does and directly like a retry. The
+prices and states of both entries must stay as they were: only newly
+fetched raw prices may be formatted. Exits with status 1 otherwise.
+
+Run from the repository root:
+
+    python -m benchmarks.check_outage
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import date
+import logging
+import sys
+import tempfile
+
+import aiohttp
+
+from custom_components.energidataservice.const import (
+    DATA_COORDINATOR,
+    DATA_HISTORY,
+    DATA_RETRY,
+    DOMAIN,
+)
+
+from .fixtures import TEMPLATES, StubClient
+from .harness import (
+    FakeHass,
+    create_api,
+    create_entry,
+    create_sensor,
+    patch_timers,
+    setup_domain,
+)
+
+
+class OutageClient(StubClient):
+    """StubClient failing every request while down is set."""
+
+    down = False
+
+    def post(self, *args, **kwargs):
+        """Fail or answer an Energi Data Service request."""
+        if self.down:
+            raise aiohttp.ClientConnectionError("outage")
+        return super().post(*args, **kwargs)
+
+    def get(self, url, headers=None):
+        """Fail or answer a Nord Pool request."""
+        if self.down:
+            raise aiohttp.ClientConnectionError("outage")
+        return super().get(url, headers)
+
+
+def snapshot(pairs: list) -> list:
+    """Return state and today's prices of every entry."""
+    return [
+        (sensor.state, [interval.price for interval in api.today or []])
+        for api, sensor in pairs
+    ]
+
+
+async def run(region: str, config_dir: str) -> bool:
+    """Run the outage and return whether the prices were left alone."""
+    hass = FakeHass(config_dir)
+    client = OutageClient(date.today())
+    setup_domain(hass, client)
+    coordinator = hass.data[DOMAIN][DATA_COORDINATOR]
+    pairs = []
+    for name, template in (("a", TEMPLATES["default"]), ("b", TEMPLATES["constant"])):
+        entry = create_entry(f"outage_{name}", region, template)
+        pairs.append((create_api(hass, entry), create_sensor(hass, entry)))
+
+    apis = [api for api, _ in pairs]
+    await coordinator.async_update_region(apis)
+    for _, sensor in pairs:
+        await sensor.validate_data()
+    before = snapshot(pairs)
+
+    client.down = True
+    ok = True
+    for how in ("coordinator", "direct"):
+        if how == "coordinator":
+            await coordinator.async_update_region(apis)
+        else:
+            for api in apis:
+                await api.update()
+        for _, sensor in pairs:
+            await sensor.validate_data()
+
+        after = snapshot(pairs)
+        for (api, _), old, new in zip(pairs, before, after):
+            same = old == new
+            ok &= same
+            print(
+                f"{region} {api.entry_id} after {how} update: "
+                f"{'unchanged' if same else 'CHANGED'} "
+                f"(state {old[0]} -> {new[0]}, first {old[1][:1]} -> {new[1][:1]})"
+            )
+
+    hass.data[DOMAIN][DATA_RETRY].cancel_all()
+    hass.data[DOMAIN][DATA_HISTORY].close()
+    return ok
+
+
+async def run_all(regions: list) -> bool:
+    """Run the outage for all regions."""
+    ok = True
+    with patch_timers(), tempfile.TemporaryDirectory() as config_dir:
+        for region in regions:
+            ok &= await run(region, config_dir)
+
+    return ok
+
+
+def main() -> None:
+    """Run the check."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("regions", nargs="*", default=["DK1", "FI"])
+    parser.add_argument("--verbose", action="store_true", help="show integration logs")
+    args = parser.parse_args()
+    if not args.verbose:
+        logging.getLogger("custom_components").setLevel(logging.CRITICAL)
+
+    if not asyncio.run(run_all(args.regions)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Local stand-in for the Energi Data Service and Nord Pool APIs.
+
+Serves the recorded payloads (rebased to the current date) with ETag support
+and configurable faults per API: latency, error statuses, disconnects, slow
+bodies and partial days. Use FakeServer from benchmarks, or run it on its own:
+
+    python -m benchmarks.fake_server --port 8080 --latency 0.2 --status 503
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from hashlib import blake2b
+import random
+from unittest import mock
+
+from aiohttp import web
+
+from custom_components.energidataservice.connectors import energidataservice, nordpool
+
+from .fixtures import (
+    eds_payload,
+    eds_rows,
+    nordpool_day,
+    nordpool_page,
+    nordpool_payload,
+)
+
+EDS_PATH = "/v1/graphql"
+NORDPOOL_PATH = "/api/marketdata/page/10"
+
+Faults = namedtuple(
+    "Faults",
+    "latency jitter status error_rate disconnect_rate slow_body partial_hours",
+    defaults=(0.0, 0.0, None, 0.0, 0.0, 0.0, None),
+)
+Faults.__doc__ = """Faults injected into responses of one API.
+
+latency/jitter: seconds before answering, plus uniform(0, jitter)
+status: status code returned instead of 200 (with error_rate, else always)
+error_rate: share of requests answered with status (500 if status is None)
+disconnect_rate: share of requests where the connection is dropped
+slow_body: seconds spent trickling the body out in chunks
+partial_hours: number of hours published for days after today
+"""
+
+CHUNKS = 20
+
+
+class FakeServer:
+    """aiohttp server answering like both upstream APIs.
+
+    Faults can be changed while the server runs by assigning to
+    server.faults["eds"] or server.faults["nordpool"].
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        today=None,
+        seed: int = None,
+    ) -> None:
+        """Initialize the server."""
+        self._host = host
+        self._port = port
+        self._today = today
+        self._random = random.Random(seed)
+        self._runner = None
+        self.faults = {"eds": Faults(), "nordpool": Faults()}
+        self.stats = Counter()
+
+    @property
+    def url(self) -> str:
+        """Return base URL of the running server."""
+        return f"http://{self._host}:{self._port}"
+
+    @property
+    def today(self) -> date:
+        """Return the date served as today, a fixed date or given by a callable."""
+        if callable(self._today):
+            return self._today()
+
+        return self._today or date.today()
+
+    async def start(self) -> None:
+        """Start listening."""
+        app = web.Application()
+        app.router.add_post(EDS_PATH, self._handle_eds)
+        app.router.add_get(NORDPOOL_PATH, self._handle_nordpool)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self._host, self._port)
+        await site.start()
+        self._port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> FakeServer:
+        """Start the server in a context."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        """Stop the server when leaving the context."""
+        await self.stop()
+
+    @contextmanager
+    def patch_connectors(self):
+        """Point both connectors at this server."""
+        with mock.patch.object(
+            energidataservice, "BASE_URL", f"{self.url}{EDS_PATH}"
+        ), mock.patch.object(
+            nordpool,
+            "BASE_URL",
+            f"{self.url}{NORDPOOL_PATH}?currency=EUR&endDate=%s",
+        ):
+            yield
+
+    async def _handle_eds(self, request: web.Request) -> web.StreamResponse:
+        """Answer a GraphQL request."""
+        await request.read()
+        faults = self.faults["eds"]
+
+        def body() -> bytes:
+            rows = eds_rows(today=self.today)
+            if faults.partial_hours is not None:
+                cutoff = datetime.combine(
+                    self.today + timedelta(days=1), datetime.min.time()
+                ) + timedelta(hours=faults.partial_hours)
+                rows = [
+                    row
+                    for row in rows
+                    if datetime.fromisoformat(row["HourUTC"]).replace(tzinfo=None)
+                    < cutoff
+                ]
+            return eds_payload(rows)
+
+        return await self._respond(request, "eds", faults, body)
+
+    async def _handle_nordpool(self, request: web.Request) -> web.StreamResponse:
+        """Answer a page 10 request."""
+        faults = self.faults["nordpool"]
+        day = nordpool_day(str(request.url))
+
+        def body() -> bytes:
+            page = nordpool_page(day)
+            if faults.partial_hours is not None and day > self.today:
+                page["data"]["Rows"] = page["data"]["Rows"][: faults.partial_hours]
+            return nordpool_payload(page)
+
+        return await self._respond(request, "nordpool", faults, body)
+
+    async def _respond(
+        self, request: web.Request, api: str, faults: Faults, body
+    ) -> web.StreamResponse:
+        """Apply faults and send the body."""
+        self.stats[f"{api}.requests"] += 1
+        if faults.latency or faults.jitter:
+            await asyncio.sleep(faults.latency + self._random.uniform(0, faults.jitter))
+
+        if faults.disconnect_rate and self._random.random() < faults.disconnect_rate:
+            self.stats[f"{api}.disconnect"] += 1
+            request.transport.close()
+            return web.Response()
+
+        if faults.error_rate and self._random.random() < faults.error_rate:
+            status = faults.status or 500
+        elif faults.status and not faults.error_rate:
+            status = faults.status
+        else:
+            status = 200
+
+        if status != 200:
+            self.stats[f"{api}.{status}"] += 1
+            return web.Response(status=status, text="Injected error")
+
+        data = body()
+        etag = f'"{blake2b(data, digest_size=8).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.stats[f"{api}.304"] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+
+        self.stats[f"{api}.200"] += 1
+        if not faults.slow_body:
+            return web.Response(
+                body=data, content_type="application/json", headers={"ETag": etag}
+            )
+
+        response = web.StreamResponse(headers={"ETag": etag})
+        response.content_type = "application/json"
+        response.content_length = len(data)
+        await response.prepare(request)
+        size = len(data) // CHUNKS + 1
+        for start in range(0, len(data), size):
+            await response.write(data[start : start + size])
+            await asyncio.sleep(faults.slow_body / CHUNKS)
+
+        await response.write_eof()
+        return response
+
+
+async def serve(args) -> None:
+    """Run the server until interrupted."""
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        status=args.status,
+        error_rate=args.error_rate,
+        disconnect_rate=args.disconnect_rate,
+        slow_body=args.slow_body,
+        partial_hours=args.partial_hours,
+    )
+    server = FakeServer(args.host, args.port, seed=args.seed)
+    server.faults = {"eds": faults, "nordpool": faults}
+    async with server:
+        print(f"Energi Data Service: {server.url}{EDS_PATH}")
+        print(f"Nord Pool: {server.url}{NORDPOOL_PATH}?currency=EUR&endDate=%s")
+        await asyncio.Event().wait()
+
+
+def main() -> None:
+    """Parse arguments and run the server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--status", type=int)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--slow-body", type=float, default=0.0)
+    parser.add_argument("--partial-hours", type=int)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Recorded payloads for both connectors, rebased to the current date.
+
+The connectors only keep prices for the local today and tomorrow, so the
+recorded days are copied onto the requested dates before they are served.
+"""
+from __future__ import annotations
+
+from copy import deepcopy
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+import json
+from pathlib import Path
+
+DATASETS = Path(__file__).parent.parent / "test_dataset"
+EDS_DATASET = DATASETS / "20220325.json"
+NORDPOOL_DATASET = DATASETS / "nordpool_20220325.json"
+RECORDED_DAY = date(2022, 3, 25)
+
+# Offsets from today served by default, as requested by the connectors
+DEFAULT_DAYS = (-1, 0, 1)
+
+# Cost templates of increasing weight
+TEMPLATES = {
+    "default": "{{0.0|float}}",
+    "constant": "{{ 1.2375 | float }}",
+    "heavy": (
+        "{% set tariffs = {'low': 0.1521, 'high': 0.4563, 'peak': 1.3689} %}"
+        "{% set ns = namespace(fees=0) %}"
+        "{% for fee in [0.0128, 0.0548, 0.697, 0.01] %}"
+        "{% set ns.fees = ns.fees + fee %}"
+        "{% endfor %}"
+        "{% if now().hour >= 17 and now().hour < 21 %}"
+        "{% set tariff = tariffs.peak if now().month in [10, 11, 12, 1, 2, 3] "
+        "else tariffs.high %}"
+        "{% elif now().hour >= 6 %}{% set tariff = tariffs.high %}"
+        "{% else %}{% set tariff = tariffs.low %}{% endif %}"
+        "{{ (tariff + ns.fees) | round(4) }}"
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def _load(path: Path) -> dict:
+    """Load and cache a recorded payload."""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def eds_rows(days: tuple = DEFAULT_DAYS, today: date = None) -> list:
+    """Return recorded Energi Data Service rows copied onto days around today."""
+    today = today or date.today()
+    recorded = _load(EDS_DATASET)["data"]["elspotprices"]
+    rows = []
+    for offset in days:
+        shift = today + timedelta(days=offset) - RECORDED_DAY
+        for row in recorded:
+            when = datetime.fromisoformat(row["HourUTC"]) + shift
+            rows.append(
+                {"HourUTC": when.isoformat(), "SpotPriceEUR": row["SpotPriceEUR"]}
+            )
+
+    return rows
+
+
+def eds_payload(rows: list) -> bytes:
+    """Return a GraphQL response body holding rows."""
+    return json.dumps({"data": {"elspotprices": rows}}).encode()
+
+
+def nordpool_page(day: date) -> dict:
+    """Return the recorded page 10 document copied onto day."""
+    page = deepcopy(_load(NORDPOOL_DATASET))
+    recorded = RECORDED_DAY.isoformat()
+    for row in page["data"]["Rows"]:
+        row["StartTime"] = row["StartTime"].replace(recorded, day.isoformat())
+
+    return page
+
+
+def nordpool_payload(page: dict) -> bytes:
+    """Return a page 10 response body."""
+    return json.dumps(page).encode()
+
+
+def nordpool_day(url: str) -> date:
+    """Return the day requested by a page 10 URL (endDate=dd-mm-YYYY)."""
+    return datetime.strptime(url.rsplit("endDate=", 1)[1][:10], "%d-%m-%Y").date()
+
+
+class StubResponse:
+    """Minimal stand-in for an aiohttp response."""
+
+    def __init__(self, status: int, body: bytes = b"", headers: dict = None) -> None:
+        """Initialize the response."""
+        self.status = status
+        self.headers = headers or {}
+        self._body = body
+
+    async def __aenter__(self) -> StubResponse:
+        """Enter the response like a request context."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Nothing to release."""
+
+    async def read(self) -> bytes:
+        """Return the body."""
+        return self._body
+
+
+class StubClient:
+    """Serve recorded payloads for both connectors without any I/O.
+
+    Bodies are built once per day, so only the connector code is measured.
+    """
+
+    def __init__(self, today: date = None) -> None:
+        """Initialize the client."""
+        self._today = today or date.today()
+        self._eds = eds_payload(eds_rows(today=self._today))
+        self._pages = {}
+        self.requests = 0
+
+    def post(self, *args, **kwargs):  # pylint: disable=unused-argument
+        """Answer an Energi Data Service GraphQL request."""
+        self.requests += 1
+        return StubResponse(200, self._eds)
+
+    def get(self, url, headers=None):  # pylint: disable=unused-argument
+        """Answer a Nord Pool page 10 request."""
+        self.requests += 1
+        day = nordpool_day(url)
+        if day not in self._pages:
+            self._pages[day] = nordpool_payload(nordpool_page(day))
+
+        return StubResponse(200, self._pages[day])
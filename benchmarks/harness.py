@@ -0,0 +1,458 @@
+"""Run the integration outside a Home Assistant instance.
+
+Provides just enough of hass for APIConnector and the sensor: configuration,
+hass.data, task creation and executor jobs (run inline so the measured cost
+is the integration's, not the thread pool's, unless an executor is given).
+
+For longer simulations SimClock replaces wall time, timers and time change
+listeners, and patch_integration() wires the integration's Home Assistant
+helpers to the fakes here.
+
+Targets Home Assistant 2022.3, the minimum in hacs.json. Newer releases
+work as long as hass.config below has every attribute template rendering
+reads, like legacy_templates.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
+from functools import partial
+import heapq
+from itertools import count
+import json
+import os
+from types import SimpleNamespace
+from unittest import mock
+
+from custom_components import energidataservice as integration
+from homeassistant.helpers.json import JSONEncoder
+from homeassistant.util import dt as dt_util
+import pytz
+
+from custom_components.energidataservice import APIConnector, sensor as sensor_platform
+from custom_components.energidataservice.connectors import (
+    energidataservice as eds_connector,
+    nordpool as nordpool_connector,
+)
+from custom_components.energidataservice.const import (
+    CONF_AREA,
+    CONF_DECIMALS,
+    CONF_PRICETYPE,
+    CONF_TEMPLATE,
+    CONF_VAT,
+    DATA_COORDINATOR,
+    DATA_FORMAT_LOCKS,
+    DATA_HEALTH,
+    DATA_HISTORY,
+    DATA_METRICS,
+    DATA_POLLERS,
+    DATA_RETRY,
+    DATA_SESSION,
+    DEFAULT_TEMPLATE,
+    DOMAIN,
+    HISTORY_PATH,
+)
+from custom_components.energidataservice.utils import coordinator, poller, retry
+from custom_components.energidataservice.utils.coordinator import SetupCoordinator
+from custom_components.energidataservice.utils.health import HealthTracker
+from custom_components.energidataservice.utils.history import HistoryStore
+from custom_components.energidataservice.utils.metrics import Metrics
+from custom_components.energidataservice.utils.poller import RegionPollers
+from custom_components.energidataservice.utils.regionhandler import RegionHandler
+from custom_components.energidataservice.utils.retry import RetryScheduler
+
+TZ = "Europe/Copenhagen"
+
+# Real seconds without any task finishing before the loop counts as idle
+IDLE_TIMEOUT = 0.2
+
+
+class FakeHass:
+    """The parts of HomeAssistant used by the integration."""
+
+    def __init__(self, config_dir: str, time_zone: str = TZ, executor=None) -> None:
+        """Initialize the instance."""
+        self.loop = asyncio.get_running_loop()
+        self.data = {}
+        self.config = SimpleNamespace(
+            config_dir=config_dir,
+            time_zone=time_zone,
+            currency="DKK",
+            legacy_templates=False,
+            path=lambda *parts: os.path.join(config_dir, *parts),
+        )
+        self.executor = executor
+        self.bus = SimpleNamespace(async_listen_once=self._listen_once)
+        self.config_entries = SimpleNamespace(
+            async_forward_entry_setup=self._forward_entry_setup
+        )
+        self.services = SimpleNamespace(async_register=self._register_service)
+        self.service_handlers = {}
+        self.entities = []
+        self.state_writes = 0
+        self.state_bytes = 0
+        self._tasks = set()
+        self._jobs = 0
+        self._stop_listeners = []
+
+    def async_add_executor_job(self, target, *args) -> asyncio.Future:
+        """Run an executor job, inline unless an executor was given.
+
+        Like Home Assistant the job starts right away, awaiting is optional.
+        """
+        if self.executor is None:
+            future = self.loop.create_future()
+            try:
+                future.set_result(target(*args))
+            except Exception as err:  # pylint: disable=broad-except
+                future.set_exception(err)
+            return future
+
+        self._jobs += 1
+        future = self.loop.run_in_executor(self.executor, target, *args)
+        future.add_done_callback(self._job_done)
+        return future
+
+    def _job_done(self, future) -> None:  # pylint: disable=unused-argument
+        """Count a finished executor job."""
+        self._jobs -= 1
+
+    def async_create_task(self, coro):
+        """Schedule a coroutine on the loop."""
+        task = self.loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def async_settle(self) -> None:
+        """Wait for tasks to finish, or until none finished for IDLE_TIMEOUT.
+
+        Tasks waiting on a SimClock timer never finish until the clock moves,
+        so tasks still pending without executor jobs in flight are left alone.
+        """
+        while self._tasks:
+            done, _ = await asyncio.wait(
+                set(self._tasks),
+                timeout=IDLE_TIMEOUT,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done and not self._jobs:
+                return
+
+    async def async_stop(self) -> None:
+        """Run stop listeners, like EVENT_HOMEASSISTANT_STOP."""
+        for listener in self._stop_listeners:
+            await listener(None)
+
+    def _register_service(
+        self, domain, service, handler, schema=None
+    ):  # pylint: disable=unused-argument
+        """Remember a service handler."""
+        self.service_handlers[(domain, service)] = handler
+
+    def _listen_once(self, event_type, listener):  # pylint: disable=unused-argument
+        """Remember a stop listener."""
+        self._stop_listeners.append(listener)
+        return lambda: None
+
+    async def _forward_entry_setup(self, entry, domain) -> bool:
+        """Set up the sensor platform of an entry."""
+        assert domain == "sensor"
+
+        def add_devices(entities):
+            for entity in entities:
+                if not entity.entity_registry_enabled_default:
+                    continue
+                entity.hass = self
+                entity.async_write_ha_state = partial(self._write_state, entity)
+                self.entities.append(entity)
+                self.async_create_task(entity.async_added_to_hass())
+
+        with mock.patch.object(
+            sensor_platform, "_async_migrate_unique_id"
+        ), mock.patch.object(
+            sensor_platform.entity_platform, "async_get_current_platform"
+        ):
+            return await sensor_platform.async_setup_entry(self, entry, add_devices)
+
+    def _write_state(self, entity) -> None:
+        """Count a state write and the size of what the recorder would store."""
+        self.state_writes += 1
+        self.state_bytes += len(
+            json.dumps(
+                {"state": entity.state, "attributes": entity.extra_state_attributes},
+                cls=JSONEncoder,
+            )
+        )
+
+
+class SimClock:
+    """Simulated time for timers, time change listeners and now().
+
+    Timers and listeners registered through patch_integration() only fire
+    when the clock is advanced.
+    """
+
+    def __init__(self, start: datetime, time_zone: str = TZ) -> None:
+        """Initialize the clock at an aware start time."""
+        self.now = start.astimezone(pytz.utc)
+        self.tz = pytz.timezone(time_zone)
+        self._timers = []
+        self._sequence = count()
+        self._listeners = {}
+
+    @property
+    def local(self) -> datetime:
+        """Return the current local time."""
+        return self.now.astimezone(self.tz)
+
+    def call_later(self, hass, delay, action):  # pylint: disable=unused-argument
+        """Run action(now) after delay simulated seconds."""
+        when = self.now + timedelta(seconds=float(delay))
+        timer = [when, next(self._sequence), action]
+        heapq.heappush(self._timers, timer)
+
+        def cancel():
+            timer[2] = None
+
+        return cancel
+
+    def track_time_change(
+        self, hass, action, hour=None, minute=None, second=None
+    ):  # pylint: disable=unused-argument
+        """Run action(now) whenever the local time matches."""
+        key = next(self._sequence)
+        self._listeners[key] = (action, hour, minute, second)
+        return lambda: self._listeners.pop(key, None)
+
+    @staticmethod
+    def _matches(pattern, value: int) -> bool:
+        """Match a value against an int, a "/N" pattern or None."""
+        if pattern is None:
+            return True
+        if isinstance(pattern, str) and pattern.startswith("/"):
+            return value % int(pattern[1:]) == 0
+
+        return int(pattern) == value
+
+    def _run(self, hass: FakeHass, action) -> None:
+        """Run a callback or schedule a coroutine function."""
+        if asyncio.iscoroutinefunction(action):
+            hass.async_create_task(action(self.now))
+        else:
+            action(self.now)
+
+    async def async_advance(self, hass: FakeHass, seconds: float) -> None:
+        """Move the clock forward, firing timers and listeners on the way.
+
+        Time change listeners are checked at every whole second passed.
+        """
+        end = self.now + timedelta(seconds=seconds)
+        second = self.now.replace(microsecond=0) + timedelta(seconds=1)
+        while second <= end:
+            while self._timers and self._timers[0][0] <= second:
+                when, _, action = heapq.heappop(self._timers)
+                if action is not None:
+                    self.now = max(self.now, when)
+                    self._run(hass, action)
+                    await hass.async_settle()
+
+            self.now = second
+            local = self.local
+            for action, hour, minute, sec in list(self._listeners.values()):
+                if (
+                    self._matches(sec, local.second)
+                    and self._matches(minute, local.minute)
+                    and self._matches(hour, local.hour)
+                ):
+                    self._run(hass, action)
+
+            await hass.async_settle()
+            second = self._next_event(second, end)
+
+        self.now = end
+
+    def _next_event(self, second: datetime, end: datetime) -> datetime:
+        """Return the next whole second with a timer or a listener that may fire."""
+        candidates = [end + timedelta(seconds=1)]
+        if self._timers:
+            candidates.append(
+                self._timers[0][0].replace(microsecond=0) + timedelta(seconds=1)
+            )
+
+        if any(spec[3] is None for spec in self._listeners.values()):
+            candidates.append(second + timedelta(seconds=1))
+        else:
+            # Listeners here only fire at whole minutes
+            candidates.append(
+                second.replace(second=0) + timedelta(minutes=1)
+                if second.second
+                else second + timedelta(minutes=1)
+            )
+
+        return min(candidates)
+
+    def datetime_class(self):
+        """Return a datetime subclass whose now() and utcnow() follow the clock."""
+        clock = self
+
+        class SimDatetime(datetime):
+            """datetime following the simulated clock."""
+
+            @classmethod
+            def now(cls, tz=None):
+                """Return simulated local (or tz) time."""
+                if tz is None:
+                    return clock.local.replace(tzinfo=None)
+                return clock.now.astimezone(tz)
+
+            @classmethod
+            def utcnow(cls):
+                """Return simulated naive UTC time."""
+                return clock.now.replace(tzinfo=None)
+
+        return SimDatetime
+
+
+class Dispatcher:
+    """In-process replacement for the Home Assistant dispatcher."""
+
+    def __init__(self, hass: FakeHass) -> None:
+        """Initialize the dispatcher."""
+        self._hass = hass
+        self._targets = defaultdict(list)
+        self.sent = 0
+        self.calls = 0
+
+    def connect(self, hass, signal, target):  # pylint: disable=unused-argument
+        """Connect a target to a signal."""
+        self._targets[signal].append(target)
+        return lambda: self._targets[signal].remove(target)
+
+    def send(self, hass, signal, *args):  # pylint: disable=unused-argument
+        """Call all targets of a signal."""
+        self.sent += 1
+        for target in list(self._targets[signal]):
+            self.calls += 1
+            if asyncio.iscoroutinefunction(target):
+                self._hass.async_create_task(target(*args))
+            else:
+                target(*args)
+
+
+class MemoryStore:
+    """In-memory replacement for homeassistant.helpers.storage.Store."""
+
+    def __init__(self, hass, version, key) -> None:  # pylint: disable=unused-argument
+        """Initialize the store."""
+        self.data = None
+
+    async def async_load(self):
+        """Return saved data."""
+        return self.data
+
+    async def async_save(self, data) -> None:
+        """Save data."""
+        self.data = data
+
+
+@contextmanager
+def patch_integration(hass: FakeHass, clock: SimClock, dispatcher: Dispatcher):
+    """Wire the integration's Home Assistant helpers to the fakes."""
+    sim_datetime = clock.datetime_class()
+
+    async def get_integration(hass, domain):  # pylint: disable=unused-argument
+        return SimpleNamespace(version="simulated")
+
+    patches = [
+        (integration, "async_get_integration", get_integration),
+        (integration, "Store", MemoryStore),
+        (integration, "async_track_time_change", clock.track_time_change),
+        (integration, "async_dispatcher_send", dispatcher.send),
+        (sensor_platform, "async_dispatcher_connect", dispatcher.connect),
+        (dt_util, "DEFAULT_TIME_ZONE", clock.tz),
+        (dt_util, "now", lambda time_zone=None: clock.local),
+        (dt_util, "utcnow", lambda: clock.now),
+        (eds_connector, "datetime", sim_datetime),
+        (nordpool_connector, "datetime", sim_datetime),
+    ]
+    patches += [
+        (module, "async_call_later", clock.call_later)
+        for module in (coordinator, poller, retry)
+    ]
+    with ExitStack() as stack:
+        for target, name, value in patches:
+            stack.enter_context(mock.patch.object(target, name, value))
+        yield
+
+
+@contextmanager
+def patch_timers():
+    """Run async_call_later timers of the integration on the plain event loop."""
+
+    def call_later(hass, delay, action):
+        handle = hass.loop.call_later(delay, action, None)
+        return handle.cancel
+
+    with ExitStack() as stack:
+        for module in (coordinator, poller, retry):
+            stack.enter_context(
+                mock.patch.object(module, "async_call_later", call_later)
+            )
+        yield
+
+
+def setup_domain(hass: FakeHass, client) -> None:
+    """Create the shared objects normally created by async_setup."""
+    coordinator = SetupCoordinator(hass)
+    hass.data[DOMAIN] = {
+        DATA_HISTORY: HistoryStore(hass.config.path(*HISTORY_PATH)),
+        DATA_METRICS: Metrics(),
+        DATA_HEALTH: HealthTracker(),
+        DATA_RETRY: RetryScheduler(hass),
+        DATA_SESSION: client,
+        DATA_COORDINATOR: coordinator,
+        DATA_FORMAT_LOCKS: defaultdict(asyncio.Lock),
+        DATA_POLLERS: RegionPollers(hass, coordinator),
+    }
+
+
+def create_entry(
+    entry_id: str,
+    area: str = "DK1",
+    template: str = DEFAULT_TEMPLATE,
+    price_type: str = "kWh",
+    **options,
+) -> SimpleNamespace:
+    """Return a stand-in config entry."""
+    return SimpleNamespace(
+        entry_id=entry_id,
+        data={"name": f"Energidataservice {entry_id}", CONF_AREA: area},
+        options={
+            CONF_AREA: area,
+            CONF_PRICETYPE: price_type,
+            CONF_DECIMALS: 3,
+            CONF_VAT: True,
+            CONF_TEMPLATE: template,
+            **options,
+        },
+    )
+
+
+def create_api(hass: FakeHass, entry) -> APIConnector:
+    """Create and register the APIConnector of an entry."""
+    api = APIConnector(hass, entry.options[CONF_AREA], entry.entry_id)
+    hass.data[DOMAIN][entry.entry_id] = api
+    return api
+
+
+def create_sensor(hass: FakeHass, entry) -> sensor_platform.EnergidataserviceSensor:
+    """Create the sensor of an entry, skipping the registry migration."""
+    region = RegionHandler(entry.options[CONF_AREA])
+    with mock.patch.object(sensor_platform, "_async_migrate_unique_id"):
+        sensor = sensor_platform.EnergidataserviceSensor(entry, hass, region)
+
+    sensor.async_write_ha_state = lambda: None
+    return sensor
@@ -0,0 +1,162 @@
+"""Replay recorded upstream responses without any network.
+
+ReplayClient stands in for the aiohttp session and answers the requests of
+both connectors from a directory of recorded responses, like test_dataset/:
+
+- Energi Data Service GraphQL responses named like 20220325.json, served for
+  every area unless the rows carry a PriceArea
+- Nord Pool page 10 documents named like nordpool_20220325.json
+
+Recorded days are reused in turn for the requested dates, so a few
+recordings can drive months of simulated time. The real connectors parse
+what is served, so their cost is part of any measurement.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+import json
+from pathlib import Path
+import re
+
+from .fixtures import StubResponse, eds_payload, nordpool_day, nordpool_payload
+
+DAY_PATTERN = re.compile(r"(\d{8})")
+EDS_RANGE = re.compile(r'_gte: \\"([\d-]+)\\", _lt: \\"([\d-]+)\\"')
+EDS_AREA = re.compile(r'PriceArea: {_eq: \\"(\w+)\\"}')
+
+# Local time from which tomorrows prices are served
+PUBLICATION = time(13, 0)
+
+
+class ReplayDataset:
+    """Recorded responses per day, loaded from a directory."""
+
+    def __init__(self, path) -> None:
+        """Load all recordings in path."""
+        self.eds = {}
+        self.nordpool = {}
+        for file in sorted(Path(path).glob("*.json")):
+            match = DAY_PATTERN.search(file.stem)
+            if not match:
+                continue
+
+            day = datetime.strptime(match[1], "%Y%m%d").date()
+            with open(file, encoding="utf-8") as handle:
+                data = json.load(handle).get("data") or {}
+
+            if "elspotprices" in data:
+                self.eds[day] = data["elspotprices"]
+            elif "Rows" in data:
+                self.nordpool[day] = data
+
+        if not self.eds and not self.nordpool:
+            raise ValueError(f"No recorded responses found in {path}")
+
+    @staticmethod
+    def _recorded(days: dict, day: date) -> date | None:
+        """Return the recorded day replayed for day."""
+        if not days:
+            return None
+        if day in days:
+            return day
+
+        recorded = sorted(days)
+        return recorded[day.toordinal() % len(recorded)]
+
+    def eds_rows(self, day: date, area: str) -> list:
+        """Return Energi Data Service rows for area, copied onto day."""
+        recorded = self._recorded(self.eds, day)
+        if recorded is None:
+            return []
+
+        shift = day - recorded
+        return [
+            {
+                "HourUTC": (datetime.fromisoformat(row["HourUTC"]) + shift).isoformat(),
+                "SpotPriceEUR": row["SpotPriceEUR"],
+            }
+            for row in self.eds[recorded]
+            if row.get("PriceArea", area) == area
+        ]
+
+    def nordpool_page(self, day: date) -> dict:
+        """Return a Nord Pool page 10 document copied onto day."""
+        recorded = self._recorded(self.nordpool, day)
+        if recorded is None:
+            return {"data": {"Rows": []}}
+
+        rows = []
+        for row in self.nordpool[recorded]["Rows"]:
+            start = datetime.fromisoformat(row["StartTime"]) + (day - recorded)
+            rows.append({**row, "StartTime": start.isoformat()})
+
+        return {"data": {**self.nordpool[recorded], "Rows": rows}}
+
+
+class ReplayClient:
+    """Answer connector requests from a ReplayDataset.
+
+    now returns the current local time. Days after today are only served
+    from the publication time on, like the upstream APIs do.
+    """
+
+    def __init__(
+        self, dataset: ReplayDataset, now=datetime.now, publication=PUBLICATION
+    ) -> None:
+        """Initialize the client."""
+        self._dataset = dataset
+        self._now = now
+        self._publication = publication
+        self._bodies = {}
+        self.requests = 0
+
+    def _available(self, day: date) -> bool:
+        """Return whether prices for day are published."""
+        now = self._now()
+        return day <= now.date() or now.time() >= self._publication
+
+    def _body(self, key: tuple, build) -> bytes:
+        """Return a cached response body, built on first use."""
+        if key not in self._bodies:
+            self._bodies[key] = build()
+
+        return self._bodies[key]
+
+    def post(self, *args, data=None, **kwargs):  # pylint: disable=unused-argument
+        """Answer an Energi Data Service GraphQL request."""
+        self.requests += 1
+        start, end = (
+            date.fromisoformat(day) for day in EDS_RANGE.search(data).groups()
+        )
+        area = EDS_AREA.search(data)[1]
+        days = []
+        while start < end:
+            if self._available(start):
+                days.append(start)
+            start += timedelta(days=1)
+
+        def build() -> bytes:
+            rows = []
+            for day in days:
+                rows += self._dataset.eds_rows(day, area)
+            return eds_payload(rows)
+
+        return StubResponse(200, self._body(("eds", area, tuple(days)), build))
+
+    def get(self, url, headers=None):  # pylint: disable=unused-argument
+        """Answer a Nord Pool page 10 request."""
+        self.requests += 1
+        day = nordpool_day(url)
+        if not self._available(day):
+            return StubResponse(200, nordpool_payload({"data": {"Rows": []}}))
+
+        return StubResponse(
+            200,
+            self._body(
+                ("nordpool", day),
+                lambda: nordpool_payload(self._dataset.nordpool_page(day)),
+            ),
+        )
+
+    async def close(self) -> None:
+        """Nothing to close, present like on a session."""
@@ -1,30 +1,62 @@
 """Adds support for Energi Data Service spot prices."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import asyncio
+from collections import defaultdict
+from datetime import timedelta
 from functools import partial
 from importlib import import_module
 from logging import getLogger
-from random import randint
+from time import monotonic
 
-from aiohttp import ServerDisconnectedError
+from aiohttp.hdrs import USER_AGENT
 from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
 from homeassistant.helpers.dispatcher import async_dispatcher_send
-from homeassistant.helpers.event import async_call_later, async_track_time_change
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.storage import Store
 from homeassistant.loader import async_get_integration
-from pytz import timezone
+from homeassistant.util import dt as dt_util
 
+from .backfill import async_setup_backfill
 from .connectors import Connectors
-from .const import CONF_AREA, DOMAIN, STARTUP, UPDATE_EDS
-from .utils.regionhandler import RegionHandler
-
-RANDOM_MINUTE = randint(0, 10)
-RANDOM_SECOND = randint(0, 59)
-
-RETRY_MINUTES = 10
-MAX_RETRY_MINUTES = 120
+from .const import (
+    CONF_AREA,
+    CONF_HEDGE_DELAY,
+    CONF_SESSION,
+    DATA_COORDINATOR,
+    DATA_FORMAT_LOCKS,
+    DATA_HEALTH,
+    DATA_HISTORY,
+    DATA_METRICS,
+    DATA_POLLERS,
+    DATA_RETRY,
+    DATA_SESSION,
+    DOMAIN,
+    HISTORY_PATH,
+    STARTUP,
+    UPDATE_EDS,
+)
+from .export import async_setup_export
+from .utils.configuration_schema import limits_from_config
+from .utils.coordinator import SetupCoordinator
+from .utils.health import HealthTracker
+from .utils.history import HistoryStore
+from .utils.metrics import Metrics
+from .utils.poller import (
+    DEFAULT_PUBLICATION_TZ,
+    DEFAULT_PUBLICATION_WINDOW,
+    RegionPollers,
+)
+from .utils.regionhandler import Currency, RegionHandler
+from .utils.retry import RetryScheduler
+from .utils.rolling import RollingPrices
+from .utils.series import DEFAULT_RESOLUTION, MIN_RESOLUTION, is_interval_boundary
+from .utils.session import CONNECTOR_ERRORS, create_session
+
+ROLLING_STORAGE_VERSION = 1
 
 _LOGGER = getLogger(__name__)
 
@@ -34,6 +66,31 @@ async def async_setup(hass: HomeAssistant, config: dict):
 
     hass.data.setdefault(DOMAIN, {})
 
+    history = HistoryStore(hass.config.path(*HISTORY_PATH))
+    hass.data[DOMAIN][DATA_HISTORY] = history
+    hass.data[DOMAIN][DATA_METRICS] = Metrics()
+    hass.data[DOMAIN][DATA_HEALTH] = HealthTracker()
+    hass.data[DOMAIN][DATA_RETRY] = retry = RetryScheduler(hass)
+    hass.data[DOMAIN][DATA_COORDINATOR] = coordinator = SetupCoordinator(hass)
+    hass.data[DOMAIN][DATA_FORMAT_LOCKS] = defaultdict(asyncio.Lock)
+    hass.data[DOMAIN][DATA_POLLERS] = pollers = RegionPollers(hass, coordinator)
+    hass.data[DOMAIN][DATA_SESSION] = session = create_session(
+        limits_from_config(config.get(DOMAIN) or [], CONF_SESSION),
+        headers={USER_AGENT: SERVER_SOFTWARE},
+    )
+
+    async def _shutdown(event):  # pylint: disable=unused-argument
+        """Cancel retries, close the session and the history store on shutdown."""
+        retry.cancel_all()
+        pollers.cancel()
+        coordinator.cancel()
+        await session.close()
+        await hass.async_add_executor_job(history.close)
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _shutdown)
+    async_setup_export(hass)
+    async_setup_backfill(hass)
+
     if DOMAIN not in config:
         return True
 
@@ -42,7 +99,7 @@ async def async_setup(hass: HomeAssistant, config: dict):
             hass.config_entries.flow.async_init(
                 DOMAIN,
                 context={"source": SOURCE_IMPORT},
-                data=conf,
+                data={key: value for key, value in conf.items() if key != CONF_SESSION},
             )
         )
 
@@ -67,8 +124,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_forward_entry_unload(entry, "sensor")
 
     if unload_ok:
-        for unsub in hass.data[DOMAIN][entry.entry_id].listeners:
+        api = hass.data[DOMAIN][entry.entry_id]
+        for unsub in api.listeners:
             unsub()
+        api.cancel_retry()
+        api.coordinator.remove(entry.entry_id)
         hass.data[DOMAIN].pop(entry.entry_id)
 
         return True
@@ -91,37 +151,43 @@ async def _setup(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass,
         entry.options.get(CONF_AREA) or entry.data.get(CONF_AREA),
         entry.entry_id,
+        entry.options.get(CONF_HEDGE_DELAY) or 0,
     )
     hass.data[DOMAIN][entry.entry_id] = api
+    api.coordinator.register(entry.entry_id)
+    await api.async_load_rolling()
+    if hass.config.currency != "EUR":
+        # Sensors convert prices on the event loop, load the rates before that
+        await hass.async_add_executor_job(Currency.load_rates)
+    signal = f"{UPDATE_EDS}_{entry.entry_id}"
 
     async def new_day(n):  # type: ignore pylint: disable=unused-argument, invalid-name
         """Handle data on new day."""
         _LOGGER.debug("New day function called")
+        await api.async_complete_day()
         api.today = api.tomorrow
         api.tomorrow = None
         api._tomorrow_valid = False  # pylint: disable=protected-access
         api.tomorrow_calculated = False
-        async_dispatcher_send(hass, UPDATE_EDS)
+        api.poller.start()
+        async_dispatcher_send(hass, signal)
 
-    async def new_hour(n):  # type: ignore pylint: disable=unused-argument, invalid-name
-        """Callback to tell the sensors to update on a new hour."""
-        _LOGGER.debug("New hour, updating state")
-        async_dispatcher_send(hass, UPDATE_EDS)
+    async def new_interval(n):  # type: ignore pylint: disable=unused-argument, invalid-name
+        """Callback to tell the sensors to update on a new price interval."""
+        if not is_interval_boundary(n, api.resolution):
+            return
 
-    async def get_new_data(n):  # type: ignore pylint: disable=unused-argument, invalid-name
-        """Fetch new data for tomorrows prices at 13:00ish CET."""
-        _LOGGER.debug("Getting latest dataset")
-        await api.update()
-        async_dispatcher_send(hass, UPDATE_EDS)
+        _LOGGER.debug("New interval, updating state")
+        async_dispatcher_send(hass, signal)
 
-    # Handle dataset updates
-    update_tomorrow = async_track_time_change(
-        hass,
-        get_new_data,
-        hour=13,
-        minute=RANDOM_MINUTE,
-        second=RANDOM_SECOND,
-    )
+    @callback
+    def new_data():
+        """Tell the sensors that the poller got new data."""
+        async_dispatcher_send(hass, signal)
+
+    # Handle dataset updates, polled once per region
+    pollers = hass.data[DOMAIN][DATA_POLLERS]
+    api.poller = pollers.add(api, new_data)
 
     update_new_day = async_track_time_change(
         hass,
@@ -131,10 +197,15 @@ async def _setup(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         second=0,
     )
 
-    update_new_hour = async_track_time_change(hass, new_hour, minute=0, second=0)
+    update_new_interval = async_track_time_change(
+        hass,
+        new_interval,
+        minute=f"/{int(MIN_RESOLUTION.total_seconds() // 60)}",
+        second=0,
+    )
 
-    api.listeners.append(update_tomorrow)
-    api.listeners.append(update_new_hour)
+    api.listeners.append(partial(pollers.remove, api))
+    api.listeners.append(update_new_interval)
     api.listeners.append(update_new_day)
 
     return True
@@ -143,7 +214,7 @@ async def _setup(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 class APIConnector:
     """An object to store Energi Data Service data."""
 
-    def __init__(self, hass, region, entry_id):
+    def __init__(self, hass, region, entry_id, hedge_delay=0):
         """Initialize Energi Data Service Connector."""
         self._connectors = Connectors()
         self.hass = hass
@@ -157,74 +228,285 @@ class APIConnector:
         self.tomorrow_calculated = False
         self.listeners = []
 
-        self.next_retry_delay = RETRY_MINUTES
-        self.retry_count = 0
+        self.rolling = RollingPrices()
+        self._rolling_store = Store(
+            hass, ROLLING_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.rolling"
+        )
 
-        self._client = async_get_clientsession(hass)
+        self._client = hass.data[DOMAIN][DATA_SESSION]
         self._region = RegionHandler(region)
         self._tz = hass.config.time_zone
         self._source = None
-
-    async def update(self, dt=None):  # type: ignore pylint: disable=unused-argument,invalid-name
-        """Fetch latest prices from Energi Data Service API"""
-        connectors = self._connectors.get_connectors(self._region.region)
+        self._publication = None
+        self.poller = None
+        self._history = hass.data[DOMAIN][DATA_HISTORY]
+        self._upstream = hass.data[DOMAIN][DATA_METRICS]
+        self.metrics = Metrics()
+        self._health = hass.data[DOMAIN][DATA_HEALTH]
+        self._retry = hass.data[DOMAIN][DATA_RETRY]
+        self._coordinator = hass.data[DOMAIN][DATA_COORDINATOR]
+        self._hedge_delay = hedge_delay
+
+    async def update(self, dt=None) -> bool:  # type: ignore pylint: disable=unused-argument,invalid-name
+        """Fetch latest prices from Energi Data Service API.
+
+        Return True if new raw prices were stored. Otherwise the current,
+        possibly already formatted, prices are left untouched.
+        """
+        candidates = self._connectors.get_connectors(self._region.region)
+        self._schedule_probes(candidates)
+        connectors = self._health.order(candidates)
 
         try:
-            for endpoint in connectors:
-                module = import_module(endpoint.namespace, __name__)
-                api = module.Connector(self._region, self._client, self._tz)
-                await api.async_get_spotprices()
-                if api.today:
-                    self.today = api.today
-                    self.tomorrow = api.tomorrow
-                    _LOGGER.debug(
-                        "%s got values from %s (namespace='%s'), breaking loop",
-                        self._region.region,
-                        endpoint.module,
-                        endpoint.namespace,
-                    )
-                    self._source = module.SOURCE_NAME
-                    break
+            if self._hedge_delay and len(connectors) > 1:
+                result = await self._race(connectors)
+            else:
+                result = await self._serial(connectors)
+
+            if result:
+                endpoint, module, api = result
+                self.today = api.today
+                self.tomorrow = api.tomorrow
+                self.today_calculated = False
+                self.tomorrow_calculated = False
+                _LOGGER.debug(
+                    "%s got values from %s (namespace='%s')",
+                    self._region.region,
+                    endpoint.module,
+                    endpoint.namespace,
+                )
+                self._source = module.SOURCE_NAME
+                self._publication = module
+                await self.hass.async_add_executor_job(
+                    self._history.append,
+                    self._region.region,
+                    (self.today or []) + (self.tomorrow or []),
+                )
+
+            if not self.today:
+                # No usable data at all, tomorrows prices are left to the poller
+                self._schedule_retry()
+            else:
+                self._retry.done(self._region.region, self._entry_id)
 
-            self.today_calculated = False
-            self.tomorrow_calculated = False
             if not self.tomorrow:
                 self._tomorrow_valid = False
                 self.tomorrow = None
+            else:
+                self._tomorrow_valid = True
 
-                midnight = datetime.strptime("23:59:59", "%H:%M:%S")
-                refresh = datetime.strptime(self.next_data_refresh, "%H:%M:%S")
-                local_tz = timezone(self.hass.config.time_zone)
-                now = datetime.now().astimezone(local_tz)
+            return bool(result)
+        except CONNECTOR_ERRORS as err:
+            _LOGGER.warning(
+                "Couldn't fetch prices for %s: %r", self._region.region, err
+            )
+            self._schedule_retry()
+            return False
+
+    async def async_request_update(self) -> None:
+        """Update through the coordinator, batched with entries in the same region."""
+        await self._coordinator.async_update(self)
+
+    def adopt(self, other: APIConnector) -> None:
+        """Take over raw prices just fetched by another entry in the same region."""
+        self.today = other.today
+        self.tomorrow = other.tomorrow
+        self._source = other.source
+        self._publication = other._publication  # pylint: disable=protected-access
+        self._tomorrow_valid = other.tomorrow_valid
+        self.today_calculated = False
+        self.tomorrow_calculated = False
+        if not self.today:
+            self._schedule_retry()
+        else:
+            self._retry.done(self._region.region, self._entry_id)
+
+    def missed(self) -> None:
+        """Keep current prices after the region failed to fetch, retry if none."""
+        if not self.today:
+            self._schedule_retry()
+
+    def _schedule_retry(self) -> None:
+        """Schedule a retry of the update, shared with entries in the same region."""
+        self._retry.schedule(self._region.region, self._entry_id, self._async_retry)
+
+    async def _async_retry(self) -> None:
+        """Retry through the coordinator, so the region is fetched only once."""
+        await self.async_request_update()
+
+    def cancel_retry(self) -> None:
+        """Stop waiting for a pending retry."""
+        self._retry.remove(self._region.region, self._entry_id)
+
+    async def _attempt(self, endpoint) -> tuple:
+        """Fetch prices from a single connector and record its latency."""
+        module = import_module(endpoint.namespace, __name__)
+        api = module.Connector(self._region, self._client, self._tz)
+        start = monotonic()
+        try:
+            await api.async_get_spotprices()
+        except Exception as err:
+            latency = monotonic() - start
+            self._record_request(endpoint.module, latency, False)
+            self._health.record_failure(endpoint.module, latency, repr(err))
+            raise
+
+        latency = monotonic() - start
+        if not api.today:
+            self._record_request(endpoint.module, latency, False)
+            self._health.record_failure(endpoint.module, latency, "No prices returned")
+            return None
+
+        self._record_request(endpoint.module, latency, True)
+        self._health.record_success(endpoint.module, latency)
+        return (endpoint, module, api)
+
+    def _record_request(self, module: str, latency: float, success: bool) -> None:
+        """Record latency and outcome of a connector request."""
+        self._upstream.observe(f"request_seconds.{module}", latency)
+        self._upstream.inc(f"requests.{module}")
+        if not success:
+            self._upstream.inc(f"request_failures.{module}")
+
+    async def _probe(self, endpoint) -> None:
+        """Probe a connector with an open circuit in the background."""
+        _LOGGER.debug("Probing %s for %s", endpoint.module, self._region.region)
+        try:
+            await self._attempt(endpoint)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Probe of %s failed: %s", endpoint.module, err)
+
+    def _schedule_probes(self, connectors: list) -> None:
+        """Start background probes for connectors whose cooldown has elapsed."""
+        for endpoint in connectors:
+            if self._health.probe_due(endpoint.module):
+                self._health.start_probe(endpoint.module)
+                self.hass.async_create_task(self._probe(endpoint))
+
+    async def _serial(self, connectors: list) -> tuple:
+        """Try connectors one after another, returning the first valid result."""
+        errors = []
+        for endpoint in connectors:
+            try:
+                result = await self._attempt(endpoint)
+            except CONNECTOR_ERRORS as err:
+                errors.append(err)
+                continue
+
+            if result:
+                return result
+
+        if errors:
+            raise errors[0]
+
+        return None
+
+    async def _race(self, connectors: list) -> tuple:
+        """Hedge connectors, starting the next one if no valid result arrives in time.
+
+        The first valid result wins and any connector still running is cancelled.
+        """
+        pending = set()
+        errors = []
+        try:
+            for idx, endpoint in enumerate(connectors):
                 _LOGGER.debug(
-                    "Now: %s:%s:%s",
-                    f"{now.hour:02d}",
-                    f"{now.minute:02d}",
-                    f"{now.second:02d}",
+                    "Starting %s for %s", endpoint.module, self._region.region
                 )
-                _LOGGER.debug(
-                    "Refresh: %s:%s:%s",
-                    f"{refresh.hour:02d}",
-                    f"{refresh.minute:02d}",
-                    f"{refresh.second:02d}",
+                pending.add(asyncio.create_task(self._attempt(endpoint)))
+                deadline = (
+                    None
+                    if idx == len(connectors) - 1
+                    else monotonic() + self._hedge_delay
                 )
-                if (
-                    f"{midnight.hour}:{midnight.minute}:{midnight.second}"
-                    > f"{now.hour:02d}:{now.minute:02d}:{now.second:02d}"
-                    and f"{refresh.hour:02d}:{refresh.minute:02d}:{refresh.second:02d}"
-                    < f"{now.hour:02d}:{now.minute:02d}:{now.second:02d}"
-                ):
-                    retry_update(self)
-                else:
-                    _LOGGER.debug(
-                        "Not forcing refresh, as we are past midnight and haven't reached next update time"  # pylint: disable=line-too-long
+
+                while pending:
+                    timeout = None if deadline is None else deadline - monotonic()
+                    if timeout is not None and timeout <= 0:
+                        break
+
+                    done, pending = await asyncio.wait(
+                        pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
                     )
-            else:
-                self.retry_count = 0
-                self._tomorrow_valid = True
-        except ServerDisconnectedError:
-            _LOGGER.warning("Server disconnected.")
-            retry_update(self)
+                    if not done:
+                        _LOGGER.debug(
+                            "No valid response for %s within %s seconds, hedging",
+                            self._region.region,
+                            self._hedge_delay,
+                        )
+                        break
+
+                    for task in done:
+                        if task.exception():
+                            errors.append(task.exception())
+                        elif task.result():
+                            return task.result()
+
+                    if not pending:
+                        # Everything started so far failed, move on right away
+                        break
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if errors:
+            raise errors[0]
+
+        return None
+
+    async def async_load_rolling(self) -> None:
+        """Load persisted rolling statistics."""
+        self.rolling = RollingPrices.from_dict(await self._rolling_store.async_load())
+
+    async def async_complete_day(self) -> None:
+        """Feed the prices of the completed day into the rolling statistics."""
+        if not self.today or not self.today_calculated:
+            return
+
+        day = self.today[0].hour.strftime("%Y-%m-%d")
+        per_hour = max(int(timedelta(hours=1) / self.resolution), 1)
+        if self.rolling.push_day(day, [i.price for i in self.today], per_hour):
+            await self._rolling_store.async_save(self.rolling.as_dict())
+
+    @property
+    def region(self) -> str:
+        """Return region code."""
+        return self._region.region
+
+    @property
+    def coordinator(self) -> SetupCoordinator:
+        """Return the setup coordinator."""
+        return self._coordinator
+
+    @property
+    def resolution(self) -> timedelta:
+        """Return resolution of the current price series."""
+        return getattr(self.today, "resolution", DEFAULT_RESOLUTION)
+
+    @property
+    def health(self) -> HealthTracker:
+        """Return connector health tracker."""
+        return self._health
+
+    @property
+    def upstream_metrics(self) -> Metrics:
+        """Return metrics shared by all entries, like connector requests."""
+        return self._upstream
+
+    @property
+    def source_latency(self) -> float | None:
+        """Return mean request latency of the current source in seconds."""
+        if self._publication is None or self._source is None:
+            return None
+
+        module = self._publication.__name__.rsplit(".", 1)[-1]
+        histogram = self._upstream.histogram(f"request_seconds.{module}")
+        return histogram.mean if histogram else None
+
+    @property
+    def retry_count(self) -> int:
+        """Return number of retries since the last successful update."""
+        return self._retry.attempts(self._region.region)
 
     @property
     def tomorrow_valid(self):
@@ -239,38 +521,42 @@ class APIConnector:
     @property
     def next_data_refresh(self):
         """When is next data update?"""
-        return f"13:{RANDOM_MINUTE:02d}:{RANDOM_SECOND:02d}"
+        if not self.poller or not self.poller.next_poll:
+            return None
+
+        return dt_util.as_local(self.poller.next_poll).strftime("%H:%M:%S")
+
+    def _publication_module(self):
+        """Return module of the source whose publication window is followed."""
+        if self._publication is None:
+            connectors = self._connectors.get_connectors(self._region.region)
+            if connectors:
+                self._publication = import_module(connectors[0].namespace, __name__)
+
+        return self._publication
+
+    @property
+    def publication_tz(self) -> str:
+        """Return timezone of the publication window."""
+        return getattr(
+            self._publication_module(), "PUBLICATION_TZ", DEFAULT_PUBLICATION_TZ
+        )
+
+    @property
+    def publication_window(self) -> tuple:
+        """Return typical publication window of the current source."""
+        return getattr(
+            self._publication_module(),
+            "PUBLICATION_WINDOW",
+            DEFAULT_PUBLICATION_WINDOW,
+        )
 
     @property
     def entry_id(self):
         """Return entry_id."""
         return self._entry_id
 
-
-def retry_update(self):
-    """Retry update on error."""
-    self.retry_count += 1
-    self.next_retry_delay = RETRY_MINUTES * self.retry_count
-    if self.next_retry_delay > MAX_RETRY_MINUTES:
-        self.next_retry_delay = MAX_RETRY_MINUTES
-
-    _LOGGER.warning(
-        "Couldn't get data from Energi Data Service, retrying in %s minutes.",
-        self.next_retry_delay,
-    )
-
-    local_tz = timezone(self.hass.config.time_zone)
-    now = (datetime.now() + timedelta(minutes=self.next_retry_delay)).astimezone(
-        local_tz
-    )
-    _LOGGER.debug(
-        "Next retry: %s:%s:%s",
-        f"{now.hour:02d}",
-        f"{now.minute:02d}",
-        f"{now.second:02d}",
-    )
-    async_call_later(
-        self.hass,
-        timedelta(minutes=self.next_retry_delay),
-        partial(self.update),
-    )
+    @property
+    def history(self) -> HistoryStore:
+        """Return the history store."""
+        return self._history
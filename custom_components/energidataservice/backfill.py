@@ -0,0 +1,65 @@
+"""Backfill of historical prices through a service."""
+from __future__ import annotations
+
+import logging
+
+from homeassistant.core import HomeAssistant, ServiceCall
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+
+from .connectors.energidataservice.regions import REGIONS
+from .const import (
+    ATTR_END,
+    ATTR_REGIONS,
+    ATTR_START,
+    DATA_HISTORY,
+    DATA_SESSION,
+    DOMAIN,
+    SERVICE_BACKFILL,
+)
+from .utils.backfill import Backfill
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_REGIONS): vol.All(cv.ensure_list, [vol.In(sorted(REGIONS))]),
+        vol.Required(ATTR_START): cv.date,
+        vol.Required(ATTR_END): cv.date,
+    }
+)
+
+
+def async_setup_backfill(hass: HomeAssistant) -> None:
+    """Register the backfill service.
+
+    Only Energi Data Service regions can be backfilled, as that is the one
+    API serving prices for arbitrary date ranges.
+    """
+    running = []
+
+    async def _backfill(call: ServiceCall) -> None:
+        """Start a backfill in the background, one at a time."""
+        if running:
+            _LOGGER.warning("A backfill is already running")
+            return
+
+        start, end = call.data[ATTR_START], call.data[ATTR_END]
+        if start >= end:
+            _LOGGER.error("Couldn't backfill prices: start must be before end")
+            return
+
+        backfill = Backfill(
+            hass, hass.data[DOMAIN][DATA_SESSION], hass.data[DOMAIN][DATA_HISTORY]
+        )
+
+        async def _run() -> None:
+            """Run the backfill, allowing the next one however it ends."""
+            try:
+                await backfill.async_run(call.data[ATTR_REGIONS], start, end)
+            finally:
+                running.clear()
+
+        running.append(hass.async_create_task(_run()))
+
+    hass.services.async_register(DOMAIN, SERVICE_BACKFILL, _backfill, BACKFILL_SCHEMA)
@@ -2,41 +2,60 @@
 from __future__ import annotations
 
 from collections import namedtuple
+from genericpath import isdir
 from importlib import import_module
 from logging import getLogger
 from os import listdir
 from posixpath import dirname
 
-from genericpath import isdir
-
 from ..const import CURRENCY_LIST, REGIONS
+from ..utils.regionhandler import RegionHandler
 
 _LOGGER = getLogger(__name__)
 
 
+Connector = namedtuple("Connector", "module namespace regions")
+
+_CONNECTORS = None
+
+
+def _discover() -> tuple:
+    """Import every connector module once and register its regions."""
+    connectors = []
+    for module in listdir(f"{dirname(__file__)}"):
+        mod_path = f"{dirname(__file__)}/{module}"
+        if isdir(mod_path) and not module.endswith("__pycache__"):
+            _LOGGER.debug("Adding module %s", module)
+            api_ns = f".{module}"
+            mod = import_module(api_ns, __name__)
+            con = Connector(module, f".connectors{api_ns}", mod.REGIONS)
+
+            if hasattr(mod, "EXTRA_REGIONS"):
+                REGIONS.update(mod.EXTRA_REGIONS)
+                RegionHandler.rebuild_index()
+
+            if hasattr(mod, "EXTRA_CURRENCIES"):
+                CURRENCY_LIST.update(mod.EXTRA_CURRENCIES)
+
+            connectors.append(con)
+
+    return tuple(connectors)
+
+
 class Connectors:
     """Handle connector modules."""
 
     def __init__(self):
-        """Initialize connector handler."""
-
-        self._connectors = []
-        for module in listdir(f"{dirname(__file__)}"):
-            mod_path = f"{dirname(__file__)}/{module}"
-            if isdir(mod_path) and not module.endswith("__pycache__"):
-                Connector = namedtuple("Connector", "module namespace regions")
-                _LOGGER.debug("Adding module %s", module)
-                api_ns = f".{module}"
-                mod = import_module(api_ns, __name__)
-                con = Connector(module, f".connectors{api_ns}", mod.REGIONS)
-
-                if hasattr(mod, "EXTRA_REGIONS"):
-                    REGIONS.update(mod.EXTRA_REGIONS)
+        """Initialize connector handler.
 
-                if hasattr(mod, "EXTRA_CURRENCIES"):
-                    CURRENCY_LIST.update(mod.EXTRA_CURRENCIES)
+        Connector modules are discovered and imported on first use only and
+        shared by every entry and config flow afterwards.
+        """
+        global _CONNECTORS  # pylint: disable=global-statement
+        if _CONNECTORS is None:
+            _CONNECTORS = _discover()
 
-                self._connectors.append(con)
+        self._connectors = list(_CONNECTORS)
 
     @property
     def connectors(self) -> list:
@@ -1,12 +1,12 @@
 """Energi Data Service connector"""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 from logging import getLogger
 
-import pytz
-
-from ...const import INTERVAL
+from ...utils.decoding import loads
+from ...utils.http_cache import RESPONSE_CACHE
+from ...utils.series import PriceSeries, split_days
 from .regions import REGIONS
 
 _LOGGER = getLogger(__name__)
@@ -15,22 +15,29 @@ BASE_URL = "https://data-api.energidataservice.dk/v1/graphql"
 
 SOURCE_NAME = "Energi Data Service"
 
+# Typical daily publication window of tomorrows prices
+PUBLICATION_TZ = "Europe/Copenhagen"
+PUBLICATION_WINDOW = (time(12, 45), time(14, 0))
 
-def prepare_data(indata, date, tz) -> list:  # pylint: disable=invalid-name
-    """Get today prices."""
-    local_tz = pytz.timezone(tz)
-    reslist = []
-    for dataset in indata:
-        tmpdate = (
-            datetime.fromisoformat(dataset["HourUTC"])
-            .replace(tzinfo=pytz.utc)
-            .astimezone(local_tz)
-        )
-        tmp = INTERVAL(dataset["SpotPriceEUR"], local_tz.normalize(tmpdate))
-        if date in tmp.hour.strftime("%Y-%m-%d"):
-            reslist.append(tmp)
 
-    return reslist
+def query_body(region: str, date_from: str, date_to: str, limit: int = 400) -> str:
+    """Create GraphQL request body for prices from date_from to date_to (UTC)."""
+    return (
+        '{"query": "query Dataset {elspotprices(where: {HourUTC: {_gte: \\"'
+        + str(date_from)
+        + '\\", _lt: \\"'
+        + str(date_to)
+        + '\\"} PriceArea: {_eq: \\"'
+        + str(region)
+        + '\\"}} order_by: {HourUTC: asc} limit: '
+        + str(limit)
+        + ' offset: 0){HourUTC SpotPriceEUR }}"}'
+    )
+
+
+def prepare_data(indata, date, tz) -> PriceSeries:  # pylint: disable=invalid-name
+    """Get prices for a local date (YYYY-MM-DD)."""
+    return split_days(indata, tz).get(date, PriceSeries())
 
 
 class Connector:
@@ -53,22 +60,29 @@ class Connector:
             self.regionhandler.region,
             body,
         )
-        resp = await self.client.post(url, data=body, headers=headers)
-
-        if resp.status == 400:
-            _LOGGER.error("API returned error 400, Bad Request!")
-            self._result = {}
-        elif resp.status == 411:
-            _LOGGER.error("API returned error 411, Invalid Request!")
-            self._result = {}
-        elif resp.status == 200:
-            res = await resp.json()
-            self._result = res["data"]["elspotprices"]
-
-            _LOGGER.debug("Response for %s:", self.regionhandler.region)
-            _LOGGER.debug(self._result)
-        else:
-            _LOGGER.error("API returned error %s", str(resp.status))
+        key = f"{SOURCE_NAME}:{body}"
+        headers.update(RESPONSE_CACHE.headers(key))
+        async with self.client.post(url, data=body, headers=headers) as resp:
+            if resp.status == 400:
+                _LOGGER.error("API returned error 400, Bad Request!")
+                self._result = {}
+            elif resp.status == 411:
+                _LOGGER.error("API returned error 411, Invalid Request!")
+                self._result = {}
+            elif resp.status == 304:
+                self._result = RESPONSE_CACHE.cached(key) or {}
+            elif resp.status == 200:
+                self._result = RESPONSE_CACHE.store(
+                    key,
+                    resp.headers,
+                    await resp.read(),
+                    lambda raw: loads(raw)["data"]["elspotprices"],
+                )
+
+                _LOGGER.debug("Response for %s:", self.regionhandler.region)
+                _LOGGER.debug(self._result)
+            else:
+                _LOGGER.error("API returned error %s", str(resp.status))
 
     @staticmethod
     def _header():
@@ -82,25 +96,32 @@ class Connector:
         date_to = (datetime.utcnow() + timedelta(days=2)).strftime("%Y-%m-%d")
         _LOGGER.debug("Start Date: %s", date_from)
         _LOGGER.debug("End Data: %s", date_to)
-        data = (
-            '{"query": "query Dataset {elspotprices(where: {HourUTC: {_gte: \\"'
-            + str(date_from)
-            + '\\", _lt: \\"'
-            + str(date_to)
-            + '\\"} PriceArea: {_eq: \\"'
-            + str(self.regionhandler.region)
-            + '\\"}} order_by: {HourUTC: asc} limit: 100 offset: 0){HourUTC SpotPriceEUR }}"}'
-        )
-        return data
+        return query_body(self.regionhandler.region, date_from, date_to)
+
+    @property
+    def _result(self):
+        """Return the raw result."""
+        return self._raw
+
+    @_result.setter
+    def _result(self, value) -> None:
+        """Store a new raw result, splitting it into local days once."""
+        self._raw = value
+        self._days = split_days(value, self._tz) if value else {}
+
+    @property
+    def days(self) -> dict:
+        """Return raw datasets of all fetched local days (YYYY-MM-DD)."""
+        return self._days
 
     @property
     def today(self):
         """Return raw dataset for today."""
         date = datetime.now().strftime("%Y-%m-%d")
-        return prepare_data(self._result, date, self._tz)
+        return self._days.get(date, PriceSeries())
 
     @property
     def tomorrow(self):
         """Return raw dataset for today."""
         date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-        return prepare_data(self._result, date, self._tz)
+        return self._days.get(date, PriceSeries())
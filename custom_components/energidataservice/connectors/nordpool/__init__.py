@@ -2,13 +2,13 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 import logging
 
-from dateutil.parser import parse as parse_dt
-import pytz
-
-from ...const import INTERVAL
+from ...utils.decoding import loads
+from ...utils.http_cache import RESPONSE_CACHE
+from ...utils.series import PriceSeries, split_days
+from ...utils.session import ConnectorError
 from .mapping import map_region
 from .regions import REGIONS
 
@@ -20,22 +20,39 @@ BASE_URL = (
 
 SOURCE_NAME = "Nord Pool"
 
+# Typical daily publication window of tomorrows prices
+PUBLICATION_TZ = "Europe/Stockholm"
+PUBLICATION_WINDOW = (time(12, 40), time(13, 45))
+
+
+def prepare_data(indata, date, tz) -> PriceSeries:  # pylint: disable=invalid-name
+    """Get prices for a local date (YYYY-MM-DD)."""
+    return split_days(indata, tz).get(date, PriceSeries())
 
-def prepare_data(indata, date, tz) -> list:  # pylint: disable=invalid-name
-    """Get today prices."""
-    local_tz = pytz.timezone(tz)
-    reslist = []
-    for dataset in indata:
-        tmpdate = (
-            datetime.fromisoformat(dataset["HourUTC"])
-            # .replace(tzinfo=pytz.utc)
-            .astimezone(local_tz)
-        )
-        tmp = INTERVAL(dataset["SpotPriceEUR"], local_tz.normalize(tmpdate))
-        if date in tmp.hour.strftime("%Y-%m-%d"):
-            reslist.append(tmp)
 
-    return reslist
+def slim_page(page: dict) -> dict:
+    """Keep only the parts of a page 10 document used by the parser.
+
+    The full document carries a dozen formatting fields per cell which would
+    otherwise be kept alive in the response cache.
+    """
+    if "data" not in page:
+        return {}
+
+    return {
+        "data": {
+            "Rows": [
+                {
+                    "StartTime": row["StartTime"],
+                    "Columns": [
+                        {"Name": col["Name"], "Value": col["Value"]}
+                        for col in row["Columns"]
+                    ],
+                }
+                for row in page["data"]["Rows"]
+            ]
+        }
+    }
 
 
 class Connector:
@@ -78,20 +95,28 @@ class Connector:
             (self.regionhandler.api_region or self.regionhandler.region),
             url,
         )
-        resp = await self.client.get(url)
-
-        if resp.status == 400:
-            _LOGGER.error("API returned error 400, Bad Request!")
-            raise BadRequest from None
-        elif resp.status == 411:
-            _LOGGER.error("API returned error 411, Invalid Request!")
-            raise InvalidRequest from None
-
-        res = await resp.json()
-        return res
+        key = f"{SOURCE_NAME}:{url}"
+        async with self.client.get(url, headers=RESPONSE_CACHE.headers(key)) as resp:
+            if resp.status == 400:
+                _LOGGER.error("API returned error 400, Bad Request!")
+                raise BadRequest from None
+            elif resp.status == 411:
+                _LOGGER.error("API returned error 411, Invalid Request!")
+                raise InvalidRequest from None
+            elif resp.status == 304:
+                return RESPONSE_CACHE.cached(key) or {}
+            elif resp.status != 200:
+                _LOGGER.error("API returned error %s", str(resp.status))
+                return {}
+
+            return RESPONSE_CACHE.store(
+                key, resp.headers, await resp.read(), lambda raw: slim_page(loads(raw))
+            )
 
     def _parse_json(self, data):
         """Parse json response"""
+        import pytz  # pylint: disable=import-outside-toplevel
+
         # Timezone for data from Nord Pool Group are "Europe/Stockholm"
         timezone = pytz.timezone("Europe/Stockholm")
 
@@ -102,6 +127,7 @@ class Connector:
         data = data["data"]
 
         region_data = []
+        known = set()
 
         if self.regionhandler.api_region:
             region = self.regionhandler.api_region
@@ -123,21 +149,15 @@ class Connector:
                 if region and name not in region:
                     continue
 
-                # Check if we already have this hour in dict
-                known = False
-                for i, val in enumerate(region_data):  # pylint: disable=unused-variable
-                    if start_hour == val["HourUTC"]:
-                        known = True
-                        break
-
-                if known:
-                    # We already have this hour in dict, skip to next
+                # Check if we already have this interval
+                if start_hour in known:
                     continue
 
                 value = self._conv_to_float(col["Value"])
                 if not value:
                     continue
 
+                known.add(start_hour)
                 region_data.append(
                     {
                         "HourUTC": start_hour,
@@ -155,26 +175,42 @@ class Connector:
         except ValueError:
             return None
 
+    @property
+    def _result(self):
+        """Return the raw result."""
+        return self._raw
+
+    @_result.setter
+    def _result(self, value) -> None:
+        """Store a new raw result, splitting it into local days once."""
+        self._raw = value
+        self._days = split_days(value, self._tz) if value else {}
+
+    @property
+    def days(self) -> dict:
+        """Return raw datasets of all fetched local days (YYYY-MM-DD)."""
+        return self._days
+
     @property
     def today(self):
         """Return raw dataset for today."""
         date = datetime.now().strftime("%Y-%m-%d")
-        return prepare_data(self._result, date, self._tz)
+        return self._days.get(date, PriceSeries())
 
     @property
     def tomorrow(self):
         """Return raw dataset for today."""
         date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-        data = prepare_data(self._result, date, self._tz)
-        if len(data) > 20:
+        data = self._days.get(date, PriceSeries())
+        if data.complete:
             return data
         else:
             return None
 
 
-class BadRequest(Exception):
+class BadRequest(ConnectorError):
     """Representation of a Bad Request exception."""
 
 
-class InvalidRequest(Exception):
+class InvalidRequest(ConnectorError):
     """Representation of an Invalid Request."""
@@ -16,15 +16,40 @@ CONF_AREA = "area"
 CONF_COUNTRY = "country"
 CONF_CURRENCY_IN_CENT = "in_cent"
 CONF_DECIMALS = "decimals"
+CONF_HEDGE_DELAY = "hedge_delay"
 CONF_PRICETYPE = "pricetype"
+CONF_SESSION = "session"
 CONF_TEMPLATE = "cost_template"
 CONF_VAT = "vat"
 
 DATA = "data"
+DATA_COORDINATOR = "coordinator"
+DATA_FORMAT_LOCKS = "format_locks"
+DATA_HEALTH = "health"
+DATA_HISTORY = "history"
+DATA_METRICS = "metrics"
+DATA_POLLERS = "pollers"
+DATA_RETRY = "retry"
+DATA_SESSION = "session"
 DEFAULT_NAME = "Energidataservice"
 DEFAULT_TEMPLATE = "{{0.0|float}}"
 DOMAIN = "energidataservice"
 
+HISTORY_PATH = (".storage", "energidataservice", "history")
+
+ATTR_CYCLES = "cycles"
+ATTR_END = "end"
+ATTR_ENTRY = "entry"
+ATTR_FORMAT = "format"
+ATTR_REGIONS = "regions"
+ATTR_START = "start"
+SERVICE_BACKFILL = "backfill"
+SERVICE_EXPORT = "export"
+SERVICE_PROFILE = "profile"
+
+# Supported features of price sensors
+SUPPORT_PROFILE = 1
+
 INTERVAL = namedtuple("Interval", "price hour")
 
 UNIQUE_ID = "unique_id"
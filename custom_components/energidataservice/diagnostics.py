@@ -0,0 +1,32 @@
+"""Diagnostics support for Energi Data Service."""
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_RETRY, DOMAIN
+from .utils.http_cache import RESPONSE_CACHE
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict:
+    """Return diagnostics for a config entry."""
+    api = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": {
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+        "source": api.source,
+        "tomorrow_valid": api.tomorrow_valid,
+        "retry_count": api.retry_count,
+        "connector_health": api.health.as_dict(),
+        "metrics": api.metrics.as_dict(),
+        "upstream_metrics": api.upstream_metrics.as_dict(),
+        "retry": hass.data[DOMAIN][DATA_RETRY].as_dict(),
+        "response_cache": RESPONSE_CACHE.as_dict(),
+        "first_state": api.coordinator.first_state(entry.entry_id),
+        "setup": api.coordinator.as_dict(),
+    }
@@ -0,0 +1,149 @@
+"""Export of stored prices through a service and an HTTP endpoint."""
+from __future__ import annotations
+
+from http import HTTPStatus
+import logging
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, ServiceCall
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+import voluptuous as vol
+
+from .const import (
+    ATTR_END,
+    ATTR_ENTRY,
+    ATTR_FORMAT,
+    ATTR_REGIONS,
+    ATTR_START,
+    DATA_HISTORY,
+    DOMAIN,
+    SERVICE_EXPORT,
+)
+from .utils.export import FORMATS, iter_export, write_export
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_REGIONS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Required(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_FORMAT, default="csv"): vol.In(list(FORMATS)),
+        vol.Optional(ATTR_ENTRY): cv.string,
+    }
+)
+
+
+async def _async_regions(hass: HomeAssistant, history, requested: list = None) -> list:
+    """Return requested regions, or all stored, raising ValueError if unknown."""
+    stored = await hass.async_add_executor_job(history.regions)
+    if not requested:
+        return stored
+
+    unknown = set(requested) - set(stored)
+    if unknown:
+        raise ValueError(f"No prices stored for {', '.join(sorted(unknown))}")
+
+    return requested
+
+
+def _check_entry(hass: HomeAssistant, entry_id: str = None) -> str:
+    """Return entry_id if it is a loaded config entry, raising ValueError if not."""
+    if entry_id and entry_id not in hass.data[DOMAIN]:
+        raise ValueError(f"Unknown config entry {entry_id}")
+
+    return entry_id or None
+
+
+def _parse_time(value: str):
+    """Parse a date or datetime, local time unless given, to UTC."""
+    parsed = dt_util.parse_datetime(value)
+    if parsed is None:
+        day = dt_util.parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date or time {value}")
+        parsed = dt_util.start_of_local_day(day)
+
+    return dt_util.as_utc(parsed)
+
+
+class ExportView(HomeAssistantView):
+    """Stream stored prices.
+
+    GET /api/energidataservice/export?start=2022-01-01&end=2023-01-01
+    with optional regions=DK1,DK2 (default: all stored), format=ndjson and
+    entry=<config entry id> to add the formatted prices of that entry.
+    """
+
+    url = f"/api/{DOMAIN}/export"
+    name = f"api:{DOMAIN}:export"
+
+    async def get(self, request: web.Request) -> web.StreamResponse:
+        """Stream the export in chunks read in the executor."""
+        hass = request.app["hass"]
+        history = hass.data[DOMAIN][DATA_HISTORY]
+        query = request.query
+        fmt = query.get(ATTR_FORMAT, "csv")
+        try:
+            if fmt not in FORMATS:
+                raise ValueError(f"Unknown format {fmt}")
+            start = _parse_time(query[ATTR_START])
+            end = _parse_time(query[ATTR_END])
+            regions = await _async_regions(
+                hass, history, [r for r in query.get(ATTR_REGIONS, "").split(",") if r]
+            )
+            entry_id = _check_entry(hass, query.get(ATTR_ENTRY))
+        except (KeyError, ValueError) as err:
+            return self.json_message(f"Invalid request: {err}", HTTPStatus.BAD_REQUEST)
+
+        response = web.StreamResponse(
+            headers={
+                "Content-Disposition": f'attachment; filename="{DOMAIN}.{fmt}"',
+            }
+        )
+        response.content_type = FORMATS[fmt]
+        await response.prepare(request)
+
+        chunks = iter_export(history, regions, start, end, fmt, entry_id=entry_id)
+        while True:
+            chunk = await hass.async_add_executor_job(next, chunks, None)
+            if chunk is None:
+                break
+            await response.write(chunk)
+
+        await response.write_eof()
+        return response
+
+
+def async_setup_export(hass: HomeAssistant) -> None:
+    """Register the export service and, with the http component, the view."""
+    history = hass.data[DOMAIN][DATA_HISTORY]
+
+    async def _export(call: ServiceCall) -> None:
+        """Write an export to the config directory."""
+        fmt = call.data[ATTR_FORMAT]
+        try:
+            regions = await _async_regions(hass, history, call.data.get(ATTR_REGIONS))
+            entry_id = _check_entry(hass, call.data.get(ATTR_ENTRY))
+        except ValueError as err:
+            _LOGGER.error("Couldn't export prices: %s", err)
+            return
+
+        path = hass.config.path(f"{DOMAIN}_export_{dt_util.now():%Y%m%d%H%M%S}.{fmt}")
+        chunks = iter_export(
+            history,
+            regions,
+            dt_util.as_utc(call.data[ATTR_START]),
+            dt_util.as_utc(call.data[ATTR_END]),
+            fmt,
+            entry_id=entry_id,
+        )
+        size = await hass.async_add_executor_job(write_export, path, chunks)
+        _LOGGER.info("Exported %s bytes of prices to %s", size, path)
+
+    hass.services.async_register(DOMAIN, SERVICE_EXPORT, _export, EXPORT_SCHEMA)
+
+    if getattr(hass, "http", None) is not None:
+        hass.http.register_view(ExportView())
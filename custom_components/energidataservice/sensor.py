@@ -1,44 +1,71 @@
 """Support for Energi Data Service sensor."""
 from __future__ import annotations
 
-from collections import namedtuple
-from datetime import datetime
+import asyncio
 import logging
+from time import monotonic
 
 from homeassistant.components import sensor
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME, DEVICE_CLASS_MONETARY
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers import (
+    device_registry as dr,
+    entity_platform,
+    entity_registry as er,
+)
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.template import Template, attach
 from homeassistant.util import dt as dt_utils, slugify as util_slugify
 from jinja2 import pass_context
+import voluptuous as vol
 
 from .const import (
-    CENT_MULTIPLIER,
+    ATTR_CYCLES,
     CONF_AREA,
     CONF_CURRENCY_IN_CENT,
     CONF_DECIMALS,
     CONF_PRICETYPE,
     CONF_TEMPLATE,
     CONF_VAT,
+    DATA_FORMAT_LOCKS,
+    DATA_RETRY,
     DEFAULT_TEMPLATE,
     DOMAIN,
-    UNIT_TO_MULTIPLIER,
+    INTERVAL,
+    SERVICE_PROFILE,
+    SUPPORT_PROFILE,
     UPDATE_EDS,
 )
+from .utils.history import entry_key
+from .utils.http_cache import RESPONSE_CACHE
+from .utils.metrics import DURATION_BUCKETS
+from .utils.pricing import localize
+from .utils.profiler import ProfileSession, profile_path
 from .utils.regionhandler import RegionHandler
+from .utils.series import PriceSeries
 
 _LOGGER = logging.getLogger(__name__)
 
+# Fee renders on the event loop between yields to other tasks
+RENDER_BATCH = 24
+
 
 async def async_setup_entry(hass, config_entry: ConfigEntry, async_add_devices):
     """Setup sensor platform from a config entry."""
     config = config_entry
     _setup(hass, config, async_add_devices)
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_PROFILE,
+        {vol.Optional(ATTR_CYCLES, default=1): vol.All(int, vol.Range(min=1))},
+        "async_profile",
+        [SUPPORT_PROFILE],
+    )
     return True
 
 
@@ -80,8 +107,9 @@ def _setup(hass, config: ConfigEntry, add_devices):
         region.set_region(area, hass.config.currency)
 
     sens = EnergidataserviceSensor(config, hass, region)
+    metrics = EnergidataserviceMetricsSensor(sens)
 
-    add_devices([sens])
+    add_devices([sens, metrics])
 
 
 @callback
@@ -130,6 +158,7 @@ class EnergidataserviceSensor(SensorEntity):
     ) -> None:
         """Initialize Energidataservice sensor."""
         self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_supported_features = SUPPORT_PROFILE
         self._config = config
         self.region = region
         self._entry_id = config.entry_id
@@ -143,6 +172,7 @@ class EnergidataserviceSensor(SensorEntity):
             CONF_DECIMALS
         )
         self._api = hass.data[DOMAIN][config.entry_id]
+        self._format_lock = hass.data[DOMAIN][DATA_FORMAT_LOCKS][region.region]
         self._cost_template = config.options.get(CONF_TEMPLATE) or config.data.get(
             CONF_TEMPLATE
         )
@@ -181,6 +211,12 @@ class EnergidataserviceSensor(SensorEntity):
         self._today_mean = None
         self._tomorrow_mean = None
 
+        # Holds rolling statistics across days
+        self._rolling = {}
+
+        # Running profile session, if any
+        self._profile_session = None
+
         # Check incase the sensor was setup using config flow.
         # This blow up if the template isnt valid.
         if not isinstance(self._cost_template, Template):
@@ -200,19 +236,14 @@ class EnergidataserviceSensor(SensorEntity):
 
         if not self._api.today:
             _LOGGER.debug("No sensor data found - calling update")
-            await self._api.update()
-            # self._api.today =
-            if not self._api.today is None:
-                await self._hass.async_add_executor_job(
-                    self._format_list, self._api.today
-                )
+            await self._api.async_request_update()
 
+        formatted = []
         if self.tomorrow_valid:
             if not self._api.tomorrow_calculated:
-                # self._api.tomorrow =
-                await self._hass.async_add_executor_job(
-                    self._format_list, self._api.tomorrow, True
-                )
+                self._api.tomorrow = await self._async_format(self._api.tomorrow)
+                self._api.tomorrow_calculated = True
+                formatted += self._api.tomorrow
             self._tomorrow_raw = self._add_raw(self._api.tomorrow)
         else:
             self._api.tomorrow = None
@@ -220,7 +251,17 @@ class EnergidataserviceSensor(SensorEntity):
             self._api.tomorrow_calculated = False
 
         if not self._api.today_calculated and not self._api.today is None:
-            await self._hass.async_add_executor_job(self._format_list, self._api.today)
+            self._api.today = await self._async_format(self._api.today)
+            self._api.today_calculated = True
+            formatted = list(self._api.today) + formatted
+
+        if formatted:
+            # One history write per update, awaited so it can't outlive the store
+            await self._hass.async_add_executor_job(
+                self._api.history.append,
+                entry_key(self.region.region, self._entry_id),
+                formatted,
+            )
 
         # Updates price for this hour.
         self._get_current_price()
@@ -244,29 +285,42 @@ class EnergidataserviceSensor(SensorEntity):
         else:
             self._tomorrow_mean = None
 
+        self._rolling = self._get_rolling()
+
         self.async_write_ha_state()
+        self._api.metrics.inc("state_writes")
+        if self._api.today:
+            self._api.coordinator.record_first_state(self._entry_id)
+
+    def _get_rolling(self) -> dict:
+        """Get rolling multi-day statistics."""
+        rolling = self._api.rolling
+
+        def _round(value):
+            return None if value is None else round(value, self._decimals)
+
+        week_over_week = rolling.week_over_week
+        percentile = rolling.percentile_rank(self._state)
+        return {
+            "rolling_mean_7d": _round(rolling.mean_week),
+            "rolling_mean_30d": _round(rolling.mean),
+            "percentile_30d": None if percentile is None else round(percentile, 1),
+            "week_over_week": (
+                None if week_over_week is None else round(week_over_week * 100, 1)
+            ),
+        }
 
     def _get_current_price(self) -> None:
-        """Get price for current hour"""
-        # now = dt_utils.now()
-        current_state_time = datetime.fromisoformat(
-            dt_utils.now()
-            .replace(microsecond=0)
-            .replace(second=0)
-            .replace(minute=0)
-            .isoformat()
-        )
-        # _LOGGER.debug(self._api.today)
+        """Get price for current interval"""
         if self._api.today:
-            for dataset in self._api.today:
-                if dataset.hour == current_state_time:
-                    self._state = dataset.price
-                    _LOGGER.debug(
-                        "Current price updated to %f for %s",
-                        self._state,
-                        self.region.region,
-                    )
-                    break
+            dataset = self._api.today.price_at(dt_utils.now())
+            if dataset:
+                self._state = dataset.price
+                _LOGGER.debug(
+                    "Current price updated to %f for %s",
+                    self._state,
+                    self.region.region,
+                )
         else:
             self._state = None
             _LOGGER.debug("No data found for %s", self.region.region)
@@ -276,7 +330,39 @@ class EnergidataserviceSensor(SensorEntity):
         await super().async_added_to_hass()
         _LOGGER.debug("Added sensor '%s'", self._entity_id)
         await self.validate_data()
-        async_dispatcher_connect(self._hass, UPDATE_EDS, self.validate_data)
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self._hass, f"{UPDATE_EDS}_{self._entry_id}", self._async_handle_update
+            )
+        )
+
+    async def _async_handle_update(self) -> None:
+        """Validate data when the entry was updated.
+
+        validate_data is looked up on every call, so it can be profiled.
+        """
+        await self.validate_data()
+
+    async def async_profile(self, cycles: int) -> None:
+        """Profile the next updates of this entry, see utils.profiler."""
+        if self._profile_session is not None:
+            _LOGGER.warning("Already profiling %s", self.name)
+            return
+
+        session = ProfileSession(profile_path(self._hass, self._entry_id), cycles)
+        if not session.available():
+            return
+
+        session.wrap(self._api, "update")
+        session.wrap(self, "validate_data", cycle=True)
+        self._profile_session = session
+        session.start(self._async_profile_done)
+
+    @callback
+    def _async_profile_done(self, session: ProfileSession) -> None:
+        """Write the profile when the session has ended."""
+        self._profile_session = None
+        self._hass.async_add_executor_job(session.dump)
 
     @property
     def unique_id(self):
@@ -328,6 +414,7 @@ class EnergidataserviceSensor(SensorEntity):
             "tomorrow_min": self.tomorrow_min,
             "tomorrow_max": self.tomorrow_max,
             "tomorrow_mean": self.tomorrow_mean,
+            **self._rolling,
             "attribution": f"Data sourced from {self._api.source}",
         }
 
@@ -358,7 +445,7 @@ class EnergidataserviceSensor(SensorEntity):
     def today(self) -> list:
         """Get todays prices
         Returns:
-            list: sorted list where today[0] is the price of hour 00.00 - 01.00
+            list: sorted list where today[0] is the price of the first interval
         """
         if not self._api.today is None:
             return [i.price for i in self._api.today if i]
@@ -369,7 +456,7 @@ class EnergidataserviceSensor(SensorEntity):
     def tomorrow(self) -> list:
         """Get tomorrows prices
         Returns:
-            list: sorted where tomorrow[0] is the price of hour 00.00 - 01.00 etc.
+            list: sorted where tomorrow[0] is the price of the first interval
         """
         if self._api.tomorrow_valid:
             return [i.price for i in self._api.tomorrow if i]
@@ -438,14 +525,9 @@ class EnergidataserviceSensor(SensorEntity):
         """Return mean value for tomorrow."""
         return self._tomorrow_mean
 
-    def _calculate(self, value=None, fake_dt=None) -> float:
-        """Do price calculations"""
-        if value is None:
-            value = self._state
-
-        # Convert currency from EUR
-        if self._currency != "EUR":
-            value = self.region.currency.convert(value, self._currency)
+    def _render_template(self, fake_dt=None) -> float:
+        """Render the cost template"""
+        self._api.metrics.inc("template_renders")
 
         # Used to inject the current hour.
         # so template can be simplified using now
@@ -457,51 +539,75 @@ class EnergidataserviceSensor(SensorEntity):
 
                 return pass_context(inner)
 
-            template_value = self._cost_template.async_render(now=faker())
-        else:
-            template_value = self._cost_template.async_render()
+            return self._cost_template.async_render(now=faker())
 
-        # The api returns prices in MWh
-        if self._price_type in ("MWh", "mWh"):
-            price = template_value / 1000 + value * float(1 + self._vat)
-        else:
-            price = template_value + value / UNIT_TO_MULTIPLIER[self._price_type] * (
-                float(1 + self._vat)
-            )
+        return self._cost_template.async_render()
 
-        if self._cent:
-            price = price * CENT_MULTIPLIER
+    async def _async_render_fees(self, data) -> list:
+        """Render the cost template for each interval of data.
 
-        return round(price, self._decimals)
+        Templates may only be rendered on the event loop. One not using now()
+        gives the same fee for every interval and is rendered once, others
+        yield to the loop every RENDER_BATCH renders.
+        """
+        if not data:
+            return []
 
-    def _format_list(self, data, tomorrow=False) -> None:
-        """Format data as list with prices localized."""
-        formatted_pricelist = []
+        if "now" not in self._cost_template.template:
+            return [self._render_template(dt_utils.as_local(data[0].hour))] * len(data)
 
-        _start = datetime.now().timestamp()
-        for i in data:
-            Interval = namedtuple("Interval", "price hour")
-            price = self._calculate(i.price, fake_dt=dt_utils.as_local(i.hour))
-            formatted_pricelist.append(Interval(price, i.hour))
+        fees = []
+        for index, interval in enumerate(data):
+            if index and not index % RENDER_BATCH:
+                await asyncio.sleep(0)
+            fees.append(self._render_template(dt_utils.as_local(interval.hour)))
 
-        _stop = datetime.now().timestamp()
-        _ttf = round(_stop - _start, 2)
+        return fees
 
-        if tomorrow:
-            _calc_for = "TOMORROW"
-            self._api.tomorrow_calculated = True
-            self._api.tomorrow = formatted_pricelist
-        else:
-            _calc_for = "TODAY"
-            self._api.today_calculated = True
-            self._api.today = formatted_pricelist
+    def _format_list(self, data, fees: list) -> PriceSeries:
+        """Return data as list with prices localized."""
+        # Convert currency from EUR
+        rate = 1.0
+        if self._currency != "EUR":
+            rate = self.region.currency.convert(rate, self._currency)
+
+        prices = localize(
+            [i.price for i in data],
+            rate,
+            self._price_type,
+            self._vat,
+            self._cent,
+            self._decimals,
+            fees,
+        )
+        return PriceSeries.like(
+            data, [INTERVAL(price, i.hour) for price, i in zip(prices, data)]
+        )
+
+    async def _async_format(self, data) -> PriceSeries:
+        """Return data with fees rendered and prices localized, on the event loop.
+
+        Sensors of a region updated together take turns, so the loop runs
+        about RENDER_BATCH renders between yields however many entries update
+        at once, and regions don't wait for each other.
+        """
+        async with self._format_lock:
+            # Let the sensors updated at the same time queue up first
+            await asyncio.sleep(0)
+            _start = monotonic()
+            formatted_pricelist = self._format_list(
+                data, await self._async_render_fees(data)
+            )
 
+        _ttf = monotonic() - _start
+        self._api.metrics.observe("format_seconds", _ttf, DURATION_BUCKETS)
         _LOGGER.debug(
-            "Calculation for %s in %s took %s seconds",
-            _calc_for,
+            "Calculation of %s intervals in %s took %s seconds",
+            len(data),
             self.region.region,
-            _ttf,
+            round(_ttf, 2),
         )
+        return formatted_pricelist
 
     @staticmethod
     def _get_specific(datatype: str, data: list):
@@ -536,3 +642,66 @@ class EnergidataserviceSensor(SensorEntity):
                 return None
         else:
             return None
+
+
+class EnergidataserviceMetricsSensor(SensorEntity):
+    """Diagnostic sensor exposing runtime metrics of an entry.
+
+    The state is the mean upstream request latency of the current source, the
+    attributes hold counters and histograms. Disabled by default.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_native_unit_of_measurement = "ms"
+    _attr_icon = "mdi:chart-bell-curve"
+
+    def __init__(self, parent: EnergidataserviceSensor) -> None:
+        """Initialize the metrics sensor."""
+        self._parent = parent
+        self._api = parent._api  # pylint: disable=protected-access
+        self._entry_id = parent._entry_id  # pylint: disable=protected-access
+        hass = parent._hass  # pylint: disable=protected-access
+        self._retry = hass.data[DOMAIN][DATA_RETRY]
+        self._attr_unique_id = f"{parent.unique_id}_metrics"
+        self._attr_name = f"{parent.name} metrics"
+
+    async def async_added_to_hass(self):
+        """Connect to dispatcher listening for entity data notifications."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, f"{UPDATE_EDS}_{self._entry_id}", self._async_update
+            )
+        )
+
+    @callback
+    def _async_update(self) -> None:
+        """Write state after the entry was updated."""
+        self.async_write_ha_state()
+
+    @property
+    def should_poll(self):
+        """No need to poll. Dispatcher notifies entity of updates."""
+        return False
+
+    @property
+    def native_value(self):
+        """Return mean upstream latency of the current source in ms."""
+        latency = self._api.source_latency
+        return None if latency is None else round(latency * 1000, 1)
+
+    @property
+    def device_info(self):
+        """Return device of the price sensor."""
+        return {"identifiers": {(DOMAIN, self._parent.unique_id)}}
+
+    @property
+    def extra_state_attributes(self):
+        """Return metrics as attributes."""
+        return {
+            "source": self._api.source,
+            **self._api.metrics.as_dict(),
+            "response_cache": RESPONSE_CACHE.as_dict(),
+            "retry": self._retry.as_dict(),
+        }
@@ -0,0 +1,223 @@
+"""Bulk backfill of historical prices into the history store."""
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, timedelta
+import logging
+from time import monotonic
+
+from ..connectors.energidataservice import BASE_URL, query_body
+from .decoding import loads
+from .history import HistoryStore
+from .series import day_bounds, parse_utc
+
+_LOGGER = logging.getLogger(__name__)
+
+# Days per request, and rows allowed per request at 15 minute resolution
+WINDOW_DAYS = 7
+WINDOW_LIMIT = WINDOW_DAYS * 96 + 8
+# Worker processes decoding and bucketing pages
+WORKERS = 2
+# Concurrent requests
+FETCHERS = 2
+# Pages waiting between two stages before the earlier stage waits
+QUEUE_SIZE = 4
+# Values collected per region before they are written
+BATCH_ROWS = 5000
+# Present in every page with prices, missing from GraphQL error responses
+PRICES_KEY = b'"elspotprices"'
+
+
+def parse_page(raw: bytes, tz: str) -> dict:  # pylint: disable=invalid-name
+    """Decode an Energi Data Service page and bucket it into local days.
+
+    Runs in a worker process, so it only takes and returns plain data:
+    {YYYY-MM-DD: [(epoch, price), ...]}.
+    """
+    import pytz  # pylint: disable=import-outside-toplevel
+
+    local_tz = pytz.timezone(tz)
+    days = {}
+    start = end = None
+    for row in loads(raw)["data"]["elspotprices"]:
+        if row["SpotPriceEUR"] is None:
+            continue
+
+        epoch = parse_utc(row["HourUTC"])
+        if start is None or not start <= epoch < end:
+            day = datetime.fromtimestamp(epoch, local_tz).date()
+            start, end, _ = day_bounds(tz, day)
+            bucket = days.setdefault(day.isoformat(), [])
+
+        bucket.append((epoch, float(row["SpotPriceEUR"])))
+
+    return days
+
+
+def windows(start: date, end: date, days: int = WINDOW_DAYS):
+    """Yield (from, to) date ranges of at most days covering [start, end)."""
+    while start < end:
+        stop = min(start + timedelta(days=days), end)
+        yield start, stop
+        start = stop
+
+
+class Backfill:
+    """Fetch, parse and store prices of regions over a range of days.
+
+    Three stages connected by bounded queues: requests on the event loop,
+    decoding and day-bucketing in a small process pool, and batched writes
+    to the history store in the executor. A full queue makes the stage
+    before it wait, so a slow disk or busy worker throttles the requests
+    instead of piling pages up in memory.
+    """
+
+    def __init__(
+        self,
+        hass,
+        client,
+        store: HistoryStore,
+        workers: int = WORKERS,
+        fetchers: int = FETCHERS,
+        queue_size: int = QUEUE_SIZE,
+        batch_rows: int = BATCH_ROWS,
+    ) -> None:
+        """Initialize the backfill."""
+        self._hass = hass
+        self._client = client
+        self._store = store
+        self._tz = hass.config.time_zone
+        self._workers = workers
+        self._fetchers = fetchers
+        self._queue_size = queue_size
+        self._batch_rows = batch_rows
+        self.stats = {"requests": 0, "failed": 0, "days": 0, "rows": 0, "seconds": 0}
+
+    async def async_run(self, regions: list, start: date, end: date) -> dict:
+        """Backfill [start, end) for all regions and return statistics."""
+        begin = monotonic()
+        pending = asyncio.Queue()
+        for region in regions:
+            for window in windows(start, end):
+                pending.put_nowait((region, *window))
+
+        # pylint: disable-next=import-outside-toplevel
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing  # pylint: disable=import-outside-toplevel
+
+        raw = asyncio.Queue(self._queue_size)
+        parsed = asyncio.Queue(self._queue_size)
+        pool = ProcessPoolExecutor(
+            self._workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        fetchers = [
+            asyncio.create_task(self._fetch(pending, raw))
+            for _ in range(self._fetchers)
+        ]
+        parsers = [
+            asyncio.create_task(self._parse(pool, raw, parsed))
+            for _ in range(self._workers)
+        ]
+        writer = asyncio.create_task(self._write(parsed))
+
+        async def feed() -> None:
+            """Run fetchers and parsers to completion, then stop the writer."""
+            await asyncio.gather(*fetchers)
+            for _ in parsers:
+                await raw.put(None)
+            await asyncio.gather(*parsers)
+            await parsed.put(None)
+
+        feeder = asyncio.create_task(feed())
+        try:
+            # Nothing drains the queues once the writer fails, so wait for
+            # both and re-raise whichever fails first
+            done, _ = await asyncio.wait(
+                (feeder, writer), return_when=asyncio.FIRST_EXCEPTION
+            )
+            for task in done:
+                task.result()
+            await writer
+        finally:
+            for task in (*fetchers, *parsers, feeder, writer):
+                task.cancel()
+            await self._hass.async_add_executor_job(pool.shutdown)
+
+        self.stats["seconds"] = round(monotonic() - begin, 1)
+        _LOGGER.info("Backfilled %s: %s", ", ".join(regions), self.stats)
+        return self.stats
+
+    async def _fetch(self, pending: asyncio.Queue, raw: asyncio.Queue) -> None:
+        """Request pages until no windows are left."""
+        while not pending.empty():
+            region, date_from, date_to = pending.get_nowait()
+            self.stats["requests"] += 1
+            try:
+                async with self._client.post(
+                    BASE_URL,
+                    data=query_body(region, date_from, date_to, WINDOW_LIMIT),
+                    headers={"Content-Type": "application/json"},
+                ) as resp:
+                    if resp.status != 200:
+                        raise ValueError(f"status {resp.status}")
+                    body = await resp.read()
+                if PRICES_KEY not in body:
+                    raise ValueError(f"no prices in response: {body[:200]!r}")
+            except Exception as err:  # pylint: disable=broad-except
+                self.stats["failed"] += 1
+                _LOGGER.warning(
+                    "Couldn't backfill %s from %s to %s: %r",
+                    region,
+                    date_from,
+                    date_to,
+                    err,
+                )
+                continue
+
+            await raw.put((region, body))
+
+    async def _parse(self, pool, raw: asyncio.Queue, parsed: asyncio.Queue) -> None:
+        """Hand pages to a worker process, one at a time per parser."""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await raw.get()
+            if item is None:
+                return
+
+            region, body = item
+            try:
+                days = await loop.run_in_executor(pool, parse_page, body, self._tz)
+            except Exception as err:  # pylint: disable=broad-except
+                self.stats["failed"] += 1
+                _LOGGER.warning("Couldn't parse a backfill page of %s: %r", region, err)
+                continue
+
+            await parsed.put((region, days))
+
+    async def _write(self, parsed: asyncio.Queue) -> None:
+        """Collect parsed days per region and write them in batches."""
+        batches = {}
+        days_seen = set()
+        while True:
+            item = await parsed.get()
+            if item is None:
+                break
+
+            region, days = item
+            batch = batches.setdefault(region, [])
+            for day, values in days.items():
+                batch += values
+                days_seen.add((region, day))
+            self.stats["days"] = len(days_seen)
+            if len(batch) >= self._batch_rows:
+                await self._flush(region, batches.pop(region))
+
+        for region, batch in batches.items():
+            await self._flush(region, batch)
+
+    async def _flush(self, region: str, batch: list) -> None:
+        """Write a batch of values in the executor."""
+        self.stats["rows"] += len(batch)
+        await self._hass.async_add_executor_job(
+            self._store.append_epochs, region, batch
+        )
@@ -14,16 +14,31 @@ from ..const import (
     CONF_COUNTRY,
     CONF_CURRENCY_IN_CENT,
     CONF_DECIMALS,
+    CONF_HEDGE_DELAY,
     CONF_PRICETYPE,
     CONF_TEMPLATE,
     CONF_VAT,
     UNIT_TO_MULTIPLIER,
 )
 from .regionhandler import RegionHandler
+from .session import SessionLimits
 
 _LOGGER = logging.getLogger(__name__)
 
 
+SESSION_SCHEMA = vol.Schema(
+    {
+        vol.Optional("connect_timeout"): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        vol.Optional("read_timeout"): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        vol.Optional("total_timeout"): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        vol.Optional("limit"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional("limit_per_host"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional("dns_ttl"): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional("keepalive"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    }
+)
+
+
 def list_to_str(data: list[Any]) -> str:
     """Convert an int list to a string."""
     return " ".join([str(i) for i in data])
@@ -48,6 +63,7 @@ def energidataservice_config_option_info_schema(options: ConfigEntry = {}) -> di
         CONF_PRICETYPE: options.get(CONF_PRICETYPE) or "kWh",
         CONF_TEMPLATE: options.get(CONF_TEMPLATE) or "",
         CONF_VAT: options.get(CONF_VAT) or True,
+        CONF_HEDGE_DELAY: options.get(CONF_HEDGE_DELAY) or 0,
     }
 
     schema = {
@@ -66,6 +82,9 @@ def energidataservice_config_option_info_schema(options: ConfigEntry = {}) -> di
             list(UNIT_TO_MULTIPLIER.keys())
         ),
         vol.Optional(CONF_TEMPLATE, default=info_options.get(CONF_TEMPLATE)): str,
+        vol.Optional(
+            CONF_HEDGE_DELAY, default=info_options.get(CONF_HEDGE_DELAY)
+        ): vol.All(vol.Coerce(float), vol.Range(min=0)),
     }
 
     _LOGGER.debug("Schema: %s", schema)
@@ -89,3 +108,12 @@ def energidataservice_config_option_initial_schema(options: ConfigEntry = {}) ->
 
     _LOGGER.debug("Schema: %s", schema)
     return schema
+
+
+def limits_from_config(confs: list, key: str) -> SessionLimits:
+    """Return session limits from the key of the YAML entries, later ones win."""
+    options = {}
+    for conf in confs:
+        options.update(SESSION_SCHEMA(conf.get(key) or {}))
+
+    return SessionLimits(**options)
@@ -0,0 +1,167 @@
+"""Batched updates for config entries sharing a region."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from time import monotonic
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .metrics import Histogram
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to collect update requests before fetching
+SETTLE_DELAY = 0.5
+# Regions fetched at the same time
+FETCH_CONCURRENCY = 4
+
+
+class SetupCoordinator:
+    """Collect update requests and fetch once per region in bounded waves.
+
+    Sensors request an update when added and whenever they lack data. Requests
+    arriving within the settle delay are grouped by region, one entry per
+    region fetches and the others adopt its result. At boot this turns dozens
+    of simultaneous fetches into one wave of at most FETCH_CONCURRENCY.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        settle: float = SETTLE_DELAY,
+        concurrency: int = FETCH_CONCURRENCY,
+    ) -> None:
+        """Initialize the coordinator."""
+        self._hass = hass
+        self._settle = settle
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._queue = {}
+        self._unsub = None
+        self._started = monotonic()
+        self._booting = True
+        self._setup_at = {}
+        self._first_state = {}
+        self.boot_to_first_state = Histogram()
+        self.waves = 0
+        self.fetches = 0
+        self.adopted = 0
+
+    def async_update(self, api) -> asyncio.Future:
+        """Queue an update of api, returning a future done when it has data."""
+        future = self._hass.loop.create_future()
+        queued = self._queue.setdefault(api.region, {})
+        queued.setdefault(api.entry_id, (api, []))[1].append(future)
+
+        if self._unsub is None:
+            self._unsub = async_call_later(self._hass, self._settle, self._flush)
+
+        return future
+
+    @callback
+    def _flush(self, now) -> None:  # pylint: disable=unused-argument
+        """Start a wave with everything queued so far."""
+        self._unsub = None
+        queue, self._queue = self._queue, {}
+        self.waves += 1
+        _LOGGER.debug(
+            "Fetching %s regions for %s entries",
+            len(queue),
+            sum(len(entries) for entries in queue.values()),
+        )
+        self._hass.async_create_task(self._async_wave(queue))
+
+    async def _async_wave(self, queue: dict) -> None:
+        """Fetch all queued regions with bounded concurrency."""
+        await asyncio.gather(
+            *(self._async_region(entries) for entries in queue.values())
+        )
+        self._booting = False
+
+    async def _async_region(self, entries: dict) -> None:
+        """Fetch a region once and share the result with all queued entries."""
+        (leader, _), *followers = entries.values()
+        try:
+            async with self._semaphore:
+                self.fetches += 1
+                fetched = await leader.update()
+
+            for api, _ in followers:
+                # Without new raw prices the leader may hold formatted ones
+                if fetched:
+                    api.adopt(leader)
+                    self.adopted += 1
+                else:
+                    api.missed()
+        except Exception as err:  # pylint: disable=broad-except
+            for _, futures in entries.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(err)
+            return
+
+        for _, futures in entries.values():
+            for future in futures:
+                if not future.done():
+                    future.set_result(fetched)
+
+    async def async_update_region(self, apis: list) -> bool:
+        """Update entries of one region now, the first fetches and the rest adopt.
+
+        For callers that already hold all entries of a region, like the shared
+        poller, so there is nothing to wait for. Return True if new prices were
+        fetched.
+        """
+        future = self._hass.loop.create_future()
+        entries = {api.entry_id: (api, []) for api in apis}
+        entries[apis[0].entry_id][1].append(future)
+        await self._async_region(entries)
+        return await future
+
+    def register(self, entry_id: str) -> None:
+        """Start measuring time to first state, from boot if still booting."""
+        self._first_state.pop(entry_id, None)
+        self._setup_at[entry_id] = self._started if self._booting else monotonic()
+
+    def record_first_state(self, entry_id: str) -> None:
+        """Record the first state written by an entry."""
+        start = self._setup_at.pop(entry_id, None)
+        if start is None:
+            return
+
+        latency = monotonic() - start
+        self._first_state[entry_id] = latency
+        self.boot_to_first_state.observe(latency)
+        _LOGGER.debug("First state for %s after %.2f seconds", entry_id, latency)
+
+    def remove(self, entry_id: str) -> None:
+        """Forget an unloaded entry."""
+        self._setup_at.pop(entry_id, None)
+        self._first_state.pop(entry_id, None)
+
+    def first_state(self, entry_id: str) -> float | None:
+        """Return seconds from boot (or setup) to the first state of an entry."""
+        return self._first_state.get(entry_id)
+
+    def cancel(self) -> None:
+        """Cancel a pending wave and the requests waiting on it."""
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+
+        for entries in self._queue.values():
+            for _, futures in entries.values():
+                for future in futures:
+                    future.cancel()
+
+        self._queue = {}
+
+    def as_dict(self) -> dict:
+        """Return a serializable representation."""
+        return {
+            "waves": self.waves,
+            "fetches": self.fetches,
+            "adopted": self.adopted,
+            "boot_to_first_state": self.boot_to_first_state.as_dict(),
+        }
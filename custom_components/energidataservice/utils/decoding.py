@@ -0,0 +1,16 @@
+"""JSON decoding with an optional fast backend."""
+from __future__ import annotations
+
+try:
+    from orjson import loads as _loads  # pylint: disable=no-name-in-module
+
+    BACKEND = "orjson"
+except ImportError:
+    from json import loads as _loads
+
+    BACKEND = "json"
+
+
+def loads(data: bytes):
+    """Decode a JSON document from bytes using the fastest available backend."""
+    return _loads(data)
@@ -0,0 +1,104 @@
+"""Streaming export of stored prices."""
+from __future__ import annotations
+
+import csv
+from datetime import datetime
+import io
+import json
+import time
+
+from .history import HistoryStore, entry_key
+
+# Rows encoded per chunk
+CHUNK_ROWS = 2000
+
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+FIELDS = ("region", "start", "raw")
+# Added when the formatted prices of a config entry are exported
+FORMATTED_FIELD = "formatted"
+
+
+def _joined(raw, formatted):
+    """Join two (epoch, value) streams sorted by epoch to (epoch, raw, formatted).
+
+    Values missing from one stream are None.
+    """
+    raw_row, formatted_row = next(raw, None), next(formatted, None)
+    while raw_row or formatted_row:
+        if formatted_row is None or (raw_row and raw_row[0] < formatted_row[0]):
+            yield raw_row[0], raw_row[1], None
+            raw_row = next(raw, None)
+        elif raw_row is None or formatted_row[0] < raw_row[0]:
+            yield formatted_row[0], None, formatted_row[1]
+            formatted_row = next(formatted, None)
+        else:
+            yield raw_row[0], raw_row[1], formatted_row[1]
+            raw_row, formatted_row = next(raw, None), next(formatted, None)
+
+
+def iter_export(
+    store: HistoryStore,
+    regions: list,
+    start: datetime,
+    end: datetime,
+    fmt: str = "csv",
+    chunk_rows: int = CHUNK_ROWS,
+    entry_id: str = None,
+):
+    """Yield an export of raw prices as encoded chunks.
+
+    Rows are read from the store and encoded chunk by chunk, so memory use
+    does not grow with the number of regions or the length of the range.
+    Times are interval starts in UTC. Formatted prices are stored per config
+    entry, so they are added as a formatted field when entry_id is given.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt}")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    fields = FIELDS + (FORMATTED_FIELD,) if entry_id else FIELDS
+    if writer:
+        writer.writerow(fields)
+
+    rows = 0
+    for region in regions:
+        stored = store.rows(region, start, end)
+        if entry_id:
+            stored = _joined(
+                stored,
+                store.rows(entry_key(region, entry_id), start, end),
+            )
+        for epoch, *values in stored:
+            stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch))
+            if writer:
+                writer.writerow(
+                    (
+                        region,
+                        stamp,
+                        *("" if value is None else value for value in values),
+                    )
+                )
+            else:
+                buffer.write(json.dumps(dict(zip(fields, (region, stamp, *values)))))
+                buffer.write("\n")
+
+            rows += 1
+            if rows == chunk_rows:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+                rows = 0
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def write_export(path: str, chunks) -> int:
+    """Write chunks to a file, returning the number of bytes written."""
+    size = 0
+    with open(path, "wb") as file:
+        for chunk in chunks:
+            size += file.write(chunk)
+
+    return size
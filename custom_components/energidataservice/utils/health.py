@@ -0,0 +1,152 @@
+"""Connector health tracking and circuit breaking."""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timedelta
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+FAILURE_THRESHOLD = 3
+COOLDOWN = timedelta(minutes=15)
+WINDOW = 20
+LATENCY_SMOOTHING = 0.3
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    """Format an optional datetime."""
+    return value.isoformat() if value else None
+
+
+class ConnectorHealth:
+    """Health of a single connector."""
+
+    def __init__(self) -> None:
+        """Initialize health state."""
+        self._results = deque(maxlen=WINDOW)
+        self.consecutive_failures = 0
+        self.latency = None
+        self.last_error = None
+        self.last_error_time = None
+        self.last_success_time = None
+        self.state = STATE_CLOSED
+        self.opened_at = None
+
+    @property
+    def success_rate(self) -> float | None:
+        """Return share of successful attempts in the recent window."""
+        if not self._results:
+            return None
+
+        return sum(self._results) / len(self._results)
+
+    def record(self, success: bool, latency: float) -> None:
+        """Record the outcome and latency of an attempt."""
+        self._results.append(success)
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += LATENCY_SMOOTHING * (latency - self.latency)
+
+    def as_dict(self) -> dict:
+        """Return a serializable representation."""
+        return {
+            "state": self.state,
+            "success_rate": self.success_rate,
+            "attempts": len(self._results),
+            "consecutive_failures": self.consecutive_failures,
+            "latency": self.latency,
+            "last_error": self.last_error,
+            "last_error_time": _isoformat(self.last_error_time),
+            "last_success_time": _isoformat(self.last_success_time),
+            "opened_at": _isoformat(self.opened_at),
+        }
+
+
+class HealthTracker:
+    """Track connector health and act as circuit breaker, shared across entries."""
+
+    def __init__(
+        self, failure_threshold: int = FAILURE_THRESHOLD, cooldown: timedelta = COOLDOWN
+    ) -> None:
+        """Initialize the tracker."""
+        self._failure_threshold = failure_threshold
+        self._cooldown = cooldown
+        self._connectors = {}
+
+    def get(self, module: str) -> ConnectorHealth:
+        """Return health of a connector."""
+        return self._connectors.setdefault(module, ConnectorHealth())
+
+    def record_success(self, module: str, latency: float) -> None:
+        """Record a successful attempt, closing the circuit."""
+        health = self.get(module)
+        health.record(True, latency)
+        health.consecutive_failures = 0
+        health.last_success_time = datetime.utcnow()
+        if health.state != STATE_CLOSED:
+            _LOGGER.info("Connector %s recovered, closing circuit", module)
+        health.state = STATE_CLOSED
+        health.opened_at = None
+
+    def record_failure(self, module: str, latency: float, error: str) -> None:
+        """Record a failed attempt, opening the circuit when failing repeatedly."""
+        health = self.get(module)
+        health.record(False, latency)
+        health.consecutive_failures += 1
+        health.last_error = error
+        health.last_error_time = datetime.utcnow()
+        if health.state == STATE_HALF_OPEN or (
+            health.state == STATE_CLOSED
+            and health.consecutive_failures >= self._failure_threshold
+        ):
+            _LOGGER.warning(
+                "Connector %s failed %s times in a row, skipping it for %s",
+                module,
+                health.consecutive_failures,
+                self._cooldown,
+            )
+            health.state = STATE_OPEN
+            health.opened_at = datetime.utcnow()
+
+    def available(self, module: str) -> bool:
+        """Return True if the circuit allows requests to the connector."""
+        return self.get(module).state == STATE_CLOSED
+
+    def probe_due(self, module: str) -> bool:
+        """Return True if an open circuit should be probed again."""
+        health = self.get(module)
+        return (
+            health.state == STATE_OPEN
+            and datetime.utcnow() - health.opened_at >= self._cooldown
+        )
+
+    def start_probe(self, module: str) -> None:
+        """Mark the connector as being probed."""
+        self.get(module).state = STATE_HALF_OPEN
+
+    def order(self, connectors: list) -> list:
+        """Order connectors by priority, skipping open ones.
+
+        Connectors that failed their latest attempt are demoted behind the
+        healthy ones. If every circuit is open, the original order is kept so
+        there is always something to try, except for connectors being probed:
+        their probe is already the attempt.
+        """
+        available = [
+            connector for connector in connectors if self.available(connector.module)
+        ]
+        available.sort(key=lambda con: self.get(con.module).consecutive_failures > 0)
+        return available or [
+            connector
+            for connector in connectors
+            if self.get(connector.module).state != STATE_HALF_OPEN
+        ]
+
+    def as_dict(self) -> dict:
+        """Return a serializable representation."""
+        return {module: health.as_dict() for module, health in self._connectors.items()}
@@ -0,0 +1,323 @@
+"""Local append-only history store for spot prices."""
+from __future__ import annotations
+
+from array import array
+from calendar import isleap, timegm
+from datetime import datetime, timedelta, timezone
+import logging
+import mmap
+import os
+from threading import RLock
+from time import monotonic
+
+from ..const import INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+# Raw prices are stored per region, formatted prices per config entry as
+# they depend on its currency, VAT and template; see entry_key.
+#
+# File layout:
+#   header: magic, format version, slots
+#   body:   one float64 slot per interval of the (UTC) year. Empty slots
+#           hold NaN.
+MAGIC = b"EDSH"
+VERSION = 1
+HEADER_SIZE = 16
+SLOT_SECONDS = 900
+PERIODS = ("day", "month")
+# Seconds between syncs of a year file to disk, it is always synced on close
+FLUSH_SECONDS = 86400
+# Separates region and entry id in keys of formatted prices
+ENTRY_SEPARATOR = "@"
+
+
+def entry_key(region: str, entry_id: str) -> str:
+    """Return the key formatted prices of a config entry are stored under."""
+    return f"{region}{ENTRY_SEPARATOR}{entry_id}"
+
+
+def _year_start(year: int) -> int:
+    """Return epoch of the start of a UTC year."""
+    return timegm((year, 1, 1, 0, 0, 0))
+
+
+def _seconds_in_year(year: int) -> int:
+    """Return number of seconds in a UTC year."""
+    return (366 if isleap(year) else 365) * 86400
+
+
+def _to_epoch(value: datetime) -> int:
+    """Convert an aware datetime to epoch seconds."""
+    return int(value.timestamp())
+
+
+class _YearFile:
+    """Memory-mapped file holding the prices of a single key and year."""
+
+    def __init__(self, path: str, year: int, create: bool) -> None:
+        """Open (and optionally create) the file."""
+        self.year = year
+        self.start = _year_start(year)
+        self.slots = _seconds_in_year(year) // SLOT_SECONDS
+
+        if create and not os.path.exists(path):
+            _LOGGER.debug("Creating history file %s", path)
+            with open(path, "wb") as file:
+                header = bytearray(HEADER_SIZE)
+                header[0:4] = MAGIC
+                header[4:6] = VERSION.to_bytes(2, "little")
+                header[8:12] = self.slots.to_bytes(4, "little")
+                file.write(header)
+                array("d", [float("nan")] * self.slots).tofile(file)
+
+        self._file = open(path, "r+b")  # pylint: disable=consider-using-with
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        if (
+            self._mmap[0:4] != MAGIC
+            or int.from_bytes(self._mmap[4:6], "little") != VERSION
+            or int.from_bytes(self._mmap[8:12], "little") != self.slots
+        ):
+            self.close()
+            raise ValueError(f"{path} is not a valid history file")
+
+        self.values = memoryview(self._mmap)[HEADER_SIZE:].cast("d")
+        self.flushed = monotonic()
+
+    def flush(self) -> None:
+        """Flush changes to disk."""
+        self._mmap.flush()
+        self.flushed = monotonic()
+
+    def close(self) -> None:
+        """Release the mapping and close the file."""
+        if getattr(self, "values", None) is not None:
+            self.values.release()
+            self.values = None
+            self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+
+
+class HistoryStore:
+    """Store prices in one file per key and year.
+
+    A key is a region, holding raw prices, or an entry key holding the
+    formatted prices of a config entry.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the store."""
+        self._path = path
+        self._files = {}
+        # Held while opening and closing files and while writing
+        self._lock = RLock()
+        self._closed = False
+
+    def _filename(self, region: str, year: int) -> str:
+        """Return path of the file for a region and year."""
+        return os.path.join(self._path, f"{region}_{year}.bin")
+
+    def _get_file(self, region: str, year: int, create: bool = False) -> _YearFile:
+        """Get an open year file, opening or creating it if needed."""
+        key = (region, year)
+        with self._lock:
+            if key not in self._files:
+                filename = self._filename(region, year)
+                if not create and not os.path.exists(filename):
+                    return None
+
+                os.makedirs(self._path, exist_ok=True)
+                self._files[key] = _YearFile(filename, year, create)
+
+            return self._files[key]
+
+    def append(self, region: str, data: list) -> None:
+        """Write a list of INTERVAL values into the store.
+
+        Slots are addressed by interval start, so writing the same interval twice
+        overwrites the previous value.
+        """
+        if not data:
+            return
+
+        self.append_epochs(
+            region, ((_to_epoch(interval.hour), interval.price) for interval in data)
+        )
+
+    def append_epochs(self, region: str, data) -> None:
+        """Write (epoch, price) pairs into the store, see append.
+
+        Changes are synced to disk at most every FLUSH_SECONDS per file.
+        Writes after close are dropped.
+        """
+        touched = set()
+        count = 0
+        with self._lock:
+            if self._closed:
+                _LOGGER.debug("History is closed, dropping %s values", region)
+                return
+
+            for epoch, price in data:
+                year = datetime.utcfromtimestamp(epoch).year
+                yearfile = self._get_file(region, year, True)
+                yearfile.values[(epoch - yearfile.start) // SLOT_SECONDS] = float(price)
+                touched.add(yearfile)
+                count += 1
+
+            now = monotonic()
+            for yearfile in touched:
+                if now - yearfile.flushed >= FLUSH_SECONDS:
+                    yearfile.flush()
+
+        _LOGGER.debug("Stored %s values for %s in history", count, region)
+
+    def _ranges(self, region: str, start: int, end: int):
+        """Yield (year file, year start, first slot, end slot) covering [start, end)."""
+        year = datetime.utcfromtimestamp(start).year
+        while True:
+            year_start = _year_start(year)
+            if year_start >= end:
+                break
+
+            yearfile = self._get_file(region, year)
+            if yearfile:
+                first = max(start - year_start, 0) // SLOT_SECONDS
+                last = min(
+                    (end - year_start + SLOT_SECONDS - 1) // SLOT_SECONDS,
+                    yearfile.slots,
+                )
+                yield yearfile, year_start, first, last
+
+            year += 1
+
+    def _slices(self, region: str, start: int, end: int):
+        """Yield (first epoch, slot seconds, values) per year file in [start, end).
+
+        values is an array("d") copied from the file, NaN for empty slots.
+        """
+        for yearfile, year_start, first, last in self._ranges(region, start, end):
+            values = array("d")
+            values.frombytes(yearfile.values[first:last].cast("B"))
+            yield year_start + first * SLOT_SECONDS, SLOT_SECONDS, values
+
+    def arrays(self, region: str, start: datetime, end: datetime) -> list:
+        """Return stored prices in [start, end) as arrays, one per year file.
+
+        Each item is (first epoch, slot seconds, array("d") with NaN for
+        missing values). This is the cheap way to read long ranges.
+        """
+        return list(self._slices(region, _to_epoch(start), _to_epoch(end)))
+
+    def rows(self, region: str, start: datetime, end: datetime):
+        """Yield (epoch, value) for every stored interval in [start, end).
+
+        Values are read a year file at a time.
+        """
+        for yearfile, year_start, first, last in self._ranges(
+            region, _to_epoch(start), _to_epoch(end)
+        ):
+            values = yearfile.values[first:last].tolist()
+            for index, value in enumerate(values):
+                # NaN is the only value not equal to itself
+                if value == value:
+                    yield year_start + (first + index) * SLOT_SECONDS, value
+
+    def regions(self) -> list:
+        """Return regions with stored prices."""
+        if not os.path.isdir(self._path):
+            return []
+
+        return sorted(
+            {
+                name.rsplit("_", 1)[0]
+                for name in os.listdir(self._path)
+                if name.endswith(".bin") and ENTRY_SEPARATOR not in name
+            }
+        )
+
+    def query(self, region: str, start: datetime, end: datetime) -> list:
+        """Return stored prices in [start, end) as a list of INTERVAL."""
+        result = []
+        for first, step, values in self._slices(
+            region, _to_epoch(start), _to_epoch(end)
+        ):
+            base = datetime.fromtimestamp(first, timezone.utc)
+            delta = timedelta(seconds=step)
+            result += [
+                INTERVAL(value, base + delta * index)
+                for index, value in enumerate(values)
+                if value == value
+            ]
+
+        return result
+
+    def aggregate(
+        self,
+        region: str,
+        start: datetime,
+        end: datetime,
+        period: str = "day",
+        tz: str = "UTC",  # pylint: disable=invalid-name
+    ) -> list:
+        """Return mean, min and max per local day or month in [start, end)."""
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period {period}")
+
+        import pytz  # pylint: disable=import-outside-toplevel
+
+        local_tz = pytz.timezone(tz)
+        chunks = list(self._slices(region, _to_epoch(start), _to_epoch(end)))
+        result = []
+        bucket = local_tz.localize(
+            start.astimezone(local_tz).replace(
+                tzinfo=None, hour=0, minute=0, second=0, microsecond=0
+            )
+        )
+        if period == "month":
+            bucket = local_tz.localize(bucket.replace(tzinfo=None, day=1))
+
+        while bucket < end:
+            if period == "day":
+                naive_next = bucket.replace(tzinfo=None) + timedelta(days=1)
+            elif bucket.month == 12:
+                naive_next = bucket.replace(tzinfo=None, year=bucket.year + 1, month=1)
+            else:
+                naive_next = bucket.replace(tzinfo=None, month=bucket.month + 1)
+            next_bucket = local_tz.localize(naive_next)
+
+            low = _to_epoch(max(bucket, start))
+            high = _to_epoch(min(next_bucket, end))
+            values = [
+                value
+                for first, step, chunk in chunks
+                for value in chunk[
+                    max(low - first, 0)
+                    // step : max(high - first + step - 1, 0)
+                    // step
+                ]
+                if value == value
+            ]
+            if values:
+                result.append(
+                    {
+                        "start": bucket,
+                        "mean": sum(values) / len(values),
+                        "min": min(values),
+                        "max": max(values),
+                        "count": len(values),
+                    }
+                )
+
+            bucket = next_bucket
+
+        return result
+
+    def close(self) -> None:
+        """Close all open files, waiting for a running write."""
+        with self._lock:
+            self._closed = True
+            for yearfile in self._files.values():
+                yearfile.close()
+
+            self._files = {}
@@ -0,0 +1,103 @@
+"""Conditional request support for connector I/O."""
+from __future__ import annotations
+
+from collections import OrderedDict, namedtuple
+from hashlib import blake2b
+import logging
+from time import monotonic
+
+from .metrics import DURATION_BUCKETS, SIZE_BUCKETS, Metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_ENTRIES = 256
+
+CacheEntry = namedtuple("CacheEntry", "etag last_modified digest parsed")
+
+
+class ResponseCache:
+    """Remember validators and parsed results per request key.
+
+    Requests send If-None-Match/If-Modified-Since when validators are known, and
+    a 304 reuses the parsed result. Without validators a hash of the body is
+    used to skip re-parsing identical responses. Parsed results are shared and
+    must not be mutated.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES) -> None:
+        """Initialize the cache."""
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self.not_modified = 0
+        self.unchanged = 0
+        self.misses = 0
+        self.metrics = Metrics()
+
+    def headers(self, key: str) -> dict:
+        """Return conditional request headers for key."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return {}
+
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        return headers
+
+    def cached(self, key: str):
+        """Return parsed result for a 304 Not Modified response."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        self._entries.move_to_end(key)
+        self.not_modified += 1
+        _LOGGER.debug("Not modified, reusing parsed response for %s", key)
+        return entry.parsed
+
+    def store(self, key: str, headers, body: bytes, parse):
+        """Return parsed body, parsing only if it differs from the cached one."""
+        source = key.split(":", 1)[0]
+        self.metrics.observe(f"payload_bytes.{source}", len(body), SIZE_BUCKETS)
+        digest = blake2b(body, digest_size=16).digest()
+        entry = self._entries.get(key)
+        if entry is not None and entry.digest == digest:
+            self.unchanged += 1
+            parsed = entry.parsed
+            _LOGGER.debug("Body unchanged, skipping parse for %s", key)
+        else:
+            self.misses += 1
+            start = monotonic()
+            parsed = parse(body)
+            self.metrics.observe(
+                f"parse_seconds.{source}", monotonic() - start, DURATION_BUCKETS
+            )
+
+        self._entries[key] = CacheEntry(
+            headers.get("ETag"), headers.get("Last-Modified"), digest, parsed
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+        return parsed
+
+    def clear(self) -> None:
+        """Forget all cached responses."""
+        self._entries.clear()
+
+    def as_dict(self) -> dict:
+        """Return hit and miss counters, payload sizes and parse times."""
+        return {
+            "entries": len(self._entries),
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "misses": self.misses,
+            **self.metrics.as_dict(),
+        }
+
+
+RESPONSE_CACHE = ResponseCache()
@@ -0,0 +1,113 @@
+"""Lightweight metrics for the integration."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict
+
+# Bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Bucket upper bounds in seconds, for work done in process
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+# Bucket upper bounds in bytes
+SIZE_BUCKETS = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 5e6)
+
+
+class Histogram:
+    """Fixed bucket histogram with count, sum, min and max."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS) -> None:
+        """Initialize the histogram."""
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        """Record a value."""
+        self._counts[bisect_left(self._buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self) -> float | None:
+        """Return mean of recorded values."""
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent: float) -> float | None:
+        """Return upper bound of the bucket holding the given percentile."""
+        if not self.count:
+            return None
+
+        target = self.count * percent / 100
+        seen = 0
+        for bound, count in zip(self._buckets, self._counts):
+            seen += count
+            if seen >= target:
+                return bound
+
+        return self.max
+
+    def as_dict(self) -> dict:
+        """Return a serializable representation."""
+        buckets = {
+            f"le_{bound}": count for bound, count in zip(self._buckets, self._counts)
+        }
+        buckets["le_inf"] = self._counts[-1]
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "buckets": buckets,
+        }
+
+
+class Metrics:
+    """Named counters and histograms, created on first use.
+
+    Cheap enough to be always on: a counter is a dict increment and a
+    histogram observation a bisect.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self._counters = defaultdict(int)
+        self._histograms = {}
+
+    def inc(self, name: str, value: int = 1) -> None:
+        """Increment a counter."""
+        self._counters[name] += value
+
+    def observe(
+        self, name: str, value: float, buckets: tuple = LATENCY_BUCKETS
+    ) -> None:
+        """Record a value in a histogram."""
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = Histogram(buckets)
+
+        histogram.observe(value)
+
+    def counter(self, name: str) -> int:
+        """Return value of a counter."""
+        return self._counters.get(name, 0)
+
+    def histogram(self, name: str) -> Histogram | None:
+        """Return a histogram, if anything was recorded."""
+        return self._histograms.get(name)
+
+    def as_dict(self) -> dict:
+        """Return a serializable representation."""
+        return {
+            "counters": dict(sorted(self._counters.items())),
+            "histograms": {
+                name: histogram.as_dict()
+                for name, histogram in sorted(self._histograms.items())
+            },
+        }
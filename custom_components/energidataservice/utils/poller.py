@@ -0,0 +1,182 @@
+"""Publication aware polling for tomorrows prices."""
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+import logging
+from random import uniform
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# Used when a connector doesn't define its own publication window
+DEFAULT_PUBLICATION_TZ = "Europe/Copenhagen"
+DEFAULT_PUBLICATION_WINDOW = (time(12, 45), time(13, 45))
+
+# Spread entries over the first minutes of the window
+WINDOW_JITTER = 120
+# Poll interval range (seconds) while inside the publication window
+POLL_MIN = 45
+POLL_MAX = 90
+# Backoff once the window has passed without complete data
+BACKOFF_BASE = 15 * 60
+BACKOFF_CAP = 2 * 60 * 60
+
+
+class AdaptivePoller:
+    """Poll for tomorrows prices around the publication window of the source.
+
+    Polls tightly (with jitter) inside the window, stops as soon as tomorrow is
+    complete and backs off sharply outside the window.
+    """
+
+    def __init__(self, hass: HomeAssistant, api, action) -> None:
+        """Initialize the poller.
+
+        api is any entry of the polled region, it provides the publication
+        window and whether tomorrow is complete.
+        """
+        self._hass = hass
+        self.api = api
+        self._action = action
+        self._unsub = None
+        self._active = False
+        self._misses = 0
+        self.next_poll = None
+
+    def _window(self, now: datetime) -> tuple:
+        """Return start and end of the publication window on the day of now."""
+        import pytz  # pylint: disable=import-outside-toplevel
+
+        tzinfo = pytz.timezone(self.api.publication_tz)
+        day = now.astimezone(tzinfo).date()
+        start, end = self.api.publication_window
+        return (
+            tzinfo.localize(datetime.combine(day, start)),
+            tzinfo.localize(datetime.combine(day, end)),
+        )
+
+    def _next_delay(self, now: datetime) -> float:
+        """Return seconds until the next poll."""
+        start, end = self._window(now)
+
+        if self.api.tomorrow_valid:
+            self._misses = 0
+            if now < start:
+                return (start - now).total_seconds() + uniform(0, WINDOW_JITTER)
+
+            next_start, _ = self._window(now + timedelta(days=1))
+            return (next_start - now).total_seconds() + uniform(0, WINDOW_JITTER)
+
+        if now < start:
+            return (start - now).total_seconds() + uniform(0, WINDOW_JITTER)
+
+        if now <= end:
+            return uniform(POLL_MIN, POLL_MAX)
+
+        self._misses += 1
+        return uniform(0.5, 1) * min(BACKOFF_CAP, BACKOFF_BASE * 2**self._misses)
+
+    def start(self) -> None:
+        """(Re)start polling from the current time."""
+        self.stop()
+        self._active = True
+        self._misses = 0
+        self._schedule()
+
+    def stop(self) -> None:
+        """Stop polling."""
+        self._active = False
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+
+    def _schedule(self) -> None:
+        """Schedule the next poll."""
+        now = dt_util.utcnow()
+        delay = self._next_delay(now)
+        self.next_poll = now + timedelta(seconds=delay)
+        _LOGGER.debug(
+            "Next poll for %s at %s",
+            self.api.region,
+            dt_util.as_local(self.next_poll),
+        )
+        self._unsub = async_call_later(self._hass, delay, self._poll)
+
+    @callback
+    def _poll(self, now) -> None:  # pylint: disable=unused-argument
+        """Run a poll."""
+        self._unsub = None
+        self._hass.async_create_task(self._async_poll())
+
+    async def _async_poll(self) -> None:
+        """Fetch data and schedule the next poll."""
+        _LOGGER.debug("Polling for tomorrows prices")
+        try:
+            await self._action()
+        finally:
+            if self._active and self._unsub is None:
+                self._schedule()
+
+
+class RegionPollers:
+    """One AdaptivePoller per region, shared by all entries in it.
+
+    A poll updates the entries of the region through the setup coordinator,
+    so one entry fetches and the others adopt its result. The source follows
+    from the region, as connector health is shared by all entries.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator) -> None:
+        """Initialize the pollers."""
+        self._hass = hass
+        self._coordinator = coordinator
+        self._regions = {}
+
+    def add(self, api, on_update) -> AdaptivePoller:
+        """Poll for an entry, calling on_update after each poll."""
+        if api.region not in self._regions:
+            entries = {}
+
+            async def poll() -> None:
+                """Update all entries of the region once, notify them if fetched.
+
+                Without new prices their formatted prices are left alone.
+                """
+                if not await self._coordinator.async_update_region(
+                    [other for other, _ in entries.values()]
+                ):
+                    return
+
+                for _, notify in list(entries.values()):
+                    notify()
+
+            poller = AdaptivePoller(self._hass, api, poll)
+            self._regions[api.region] = (poller, entries)
+            poller.start()
+
+        poller, entries = self._regions[api.region]
+        entries[api.entry_id] = (api, on_update)
+        return poller
+
+    def remove(self, api) -> None:
+        """Stop polling for an entry, and for its region if it was the last."""
+        poller, entries = self._regions.get(api.region, (None, {}))
+        entries.pop(api.entry_id, None)
+        if poller is None:
+            return
+
+        if not entries:
+            poller.stop()
+            del self._regions[api.region]
+        elif poller.api is api:
+            poller.api = next(iter(entries.values()))[0]
+
+    def cancel(self) -> None:
+        """Stop all pollers."""
+        for poller, _ in self._regions.values():
+            poller.stop()
+
+        self._regions = {}
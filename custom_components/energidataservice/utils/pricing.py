@@ -0,0 +1,38 @@
+"""Price transforms from raw EUR/MWh spot prices."""
+from __future__ import annotations
+
+from ..const import CENT_MULTIPLIER, UNIT_TO_MULTIPLIER
+
+
+def localize(
+    values: list,
+    rate: float = 1.0,
+    price_type: str = "kWh",
+    vat: float = 0,
+    cent: bool = False,
+    decimals: int = 3,
+    fees=0.0,
+) -> list:
+    """Return prices in another currency and unit with VAT and fees added.
+
+    values are spot prices in EUR/MWh and rate the exchange rate from EUR.
+    fees are added like the result of a sensor's cost template, either one
+    for all values or one per value.
+    """
+    if isinstance(fees, (int, float)):
+        fees = [fees] * len(values)
+
+    vat = float(1 + vat)
+    scale = CENT_MULTIPLIER if cent else 1
+    # The api returns prices in MWh
+    if price_type in ("MWh", "mWh"):
+        return [
+            round((fee / 1000 + value * rate * vat) * scale, decimals)
+            for value, fee in zip(values, fees)
+        ]
+
+    unit = UNIT_TO_MULTIPLIER[price_type]
+    return [
+        round((fee + value * rate / unit * vat) * scale, decimals)
+        for value, fee in zip(values, fees)
+    ]
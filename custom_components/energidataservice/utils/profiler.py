@@ -0,0 +1,119 @@
+"""On-demand profiling of update cycles."""
+from __future__ import annotations
+
+import cProfile
+from datetime import datetime
+import logging
+import types
+
+from homeassistant.core import HomeAssistant
+
+from ..const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _enable(profile: cProfile.Profile) -> bool:
+    """Enable profile, return False if another profiler is already active."""
+    try:
+        profile.enable()
+    except ValueError:
+        return False
+
+    return True
+
+
+@types.coroutine
+def _profiled(coro, profile: cProfile.Profile):
+    """Await coro, profiling only while it runs, not while it is suspended.
+
+    Steps run while another profiler is active are not profiled.
+    """
+    value = error = None
+    while True:
+        enabled = _enable(profile)
+        try:
+            if error is None:
+                future = coro.send(value)
+            else:
+                future = coro.throw(error)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            if enabled:
+                profile.disable()
+
+        try:
+            value, error = (yield future), None
+        except BaseException as err:  # pylint: disable=broad-except
+            value, error = None, err
+
+
+class ProfileSession:
+    """Profile the next cycles of an entry with cProfile.
+
+    Methods are wrapped by shadowing them on the instance and restored when
+    the session ends, so nothing is paid while no session runs. Only code run
+    on the event loop is profiled; executor jobs show up as time waiting.
+    """
+
+    def __init__(self, path: str, cycles: int) -> None:
+        """Initialize the session."""
+        self.path = path
+        self.remaining = cycles
+        self._profile = cProfile.Profile()
+        self._patched = []
+        self._done = None
+
+    def available(self) -> bool:
+        """Return True if profiling can start, logging why if not."""
+        if not _enable(self._profile):
+            _LOGGER.warning(
+                "Another profiler is active, not profiling into %s", self.path
+            )
+            return False
+
+        self._profile.disable()
+        return True
+
+    def wrap(self, obj, name: str, cycle: bool = False) -> None:
+        """Profile calls to an async method, counting a cycle per call if set."""
+        method = getattr(obj, name)
+
+        async def _wrapper(*args, **kwargs):
+            try:
+                return await _profiled(method(*args, **kwargs), self._profile)
+            finally:
+                if cycle:
+                    self._cycle()
+
+        setattr(obj, name, _wrapper)
+        self._patched.append((obj, name))
+
+    def start(self, done) -> None:
+        """Start profiling, calling done(session) after the last cycle."""
+        self._done = done
+        _LOGGER.info("Profiling the next %s updates into %s", self.remaining, self.path)
+
+    def _cycle(self) -> None:
+        """Count a finished cycle, ending the session after the last."""
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.stop()
+            self._done(self)
+
+    def stop(self) -> None:
+        """Restore wrapped methods."""
+        for obj, name in self._patched:
+            delattr(obj, name)
+        self._patched.clear()
+
+    def dump(self) -> None:
+        """Write collected stats in pstats format, runs in the executor."""
+        self._profile.dump_stats(self.path)
+        _LOGGER.info("Wrote profile to %s", self.path)
+
+
+def profile_path(hass: HomeAssistant, entry_id: str) -> str:
+    """Return path of a new profile for an entry in the config directory."""
+    return hass.config.path(f"{DOMAIN}_{entry_id}_{datetime.now():%Y%m%d%H%M%S}.prof")
@@ -1,39 +1,90 @@
 """Utils for handling regions."""
 from __future__ import annotations
 
+from collections import namedtuple
 import logging
-
-from currency_converter import CurrencyConverter
+from types import MappingProxyType
 
 from ..const import CURRENCY_LIST, REGIONS
 
 _LOGGER = logging.getLogger(__name__)
 
 
+RegionIndex = namedtuple(
+    "RegionIndex", "regions descriptions countries country_regions"
+)
+
+_INDEX = None
+_CONVERTER = None
+
+
+def _build_index() -> RegionIndex:
+    """Build immutable forward and reverse lookups from REGIONS."""
+    regions = {}
+    descriptions = {}
+    country_regions = {}
+    for region, meta in REGIONS.items():
+        regions[region] = tuple(meta)
+        descriptions.setdefault(meta[2], region)
+        country_regions.setdefault(meta[1], []).append(region)
+
+    return RegionIndex(
+        MappingProxyType(regions),
+        MappingProxyType(descriptions),
+        tuple(country_regions),
+        MappingProxyType(
+            {country: tuple(regs) for country, regs in country_regions.items()}
+        ),
+    )
+
+
+def _get_index() -> RegionIndex:
+    """Return lookup indexes, building them on first use."""
+    if _INDEX is None:
+        RegionHandler.rebuild_index()
+
+    return _INDEX
+
+
+def _get_converter():
+    """Return the shared currency converter, loading rates on first use."""
+    global _CONVERTER  # pylint: disable=global-statement
+    if _CONVERTER is None:
+        from currency_converter import (  # pylint: disable=import-outside-toplevel
+            CurrencyConverter,
+        )
+
+        _CONVERTER = CurrencyConverter()
+
+    return _CONVERTER
+
+
 class Currency:
     """Define currency class."""
 
-    _converter: CurrencyConverter
-
     def __init__(self, currency: dict) -> None:
         """Initialize a new Currency object."""
         self._name = currency["name"]
         self._symbol = currency["symbol"]
         self._cent = currency["cent"]
-        self._converter = CurrencyConverter()
 
     def convert(
         self, value: float, to_currency: str, from_currency: str = "EUR"
     ) -> float:
         """Do the conversion."""
         try:
-            return self._converter.convert(value, from_currency, to_currency)
+            return _get_converter().convert(value, from_currency, to_currency)
         except ValueError:
             _LOGGER.warning(
                 "Invalid currency for conversion, returning prices in %s", self._name
             )
             return value
 
+    @staticmethod
+    def load_rates() -> None:
+        """Load conversion rates, blocking on I/O, so run it in the executor."""
+        _get_converter()
+
     @property
     def name(self) -> str:
         """Return name of currency."""
@@ -79,91 +130,74 @@ class RegionHandler:
         """Set API specific region."""
         self._api_region = region
 
+    @staticmethod
+    def rebuild_index() -> None:
+        """Rebuild lookup indexes, after connectors have registered extra regions."""
+        global _INDEX  # pylint: disable=global-statement
+        _INDEX = _build_index()
+
     @staticmethod
     def get_countries(sort: bool = False, descending: bool = False) -> list:
         """Get list of available countries."""
-        countries = []
-
-        for region in REGIONS.items():
-            country = region[1][1]
-            if not country in countries:
-                countries.append(country)
-
+        countries = list(_get_index().countries)
         return countries if not sort else sorted(countries, reverse=descending)
 
     @staticmethod
     def get_regions(country: str, sort: bool = False, descending: bool = False) -> list:
         """Get list of available regions in country."""
-        regions = []
-
-        for region in REGIONS.items():
-            if country == region[1][1]:
-                regions.append(RegionHandler.region_to_description(region[0]))
-
+        index = _get_index()
+        regions = [
+            index.regions[region][2]
+            for region in index.country_regions.get(country, ())
+        ]
         return regions if not sort else sorted(regions, reverse=descending)
 
     @staticmethod
     def regions_in_country(country: str) -> str:
         """Get available regions in country."""
-        regions = []
-
-        for region in REGIONS.items():
-            if country == region[1][1]:
-                regions.append(region[0])
-
-        return regions
+        return list(_get_index().country_regions.get(country, ()))
 
     @staticmethod
     def region_to_description(region: str) -> str:
         """Get normal human readable description from region."""
-        for reg in REGIONS.items():
-            if reg[0] == region:
-                return reg[1][2]
-
-        return None
+        meta = _get_index().regions.get(region)
+        return meta[2] if meta else None
 
     @staticmethod
     def description_to_region(description: str) -> str:
-        """Get region from description."""
-        _LOGGER.debug("Looking up region for description: %s", description)
+        """Get region from description, region codes are returned as is."""
+        index = _get_index()
+        if description in index.regions:
+            return description
 
-        for region in REGIONS.items():
-            if region[1][2] == description:
-                _LOGGER.debug(" - Found description in %s", region[0])
-                return region[0]
+        region = index.descriptions.get(description)
+        if region is None:
+            _LOGGER.debug("Couldn't match description, %s, to region!", description)
+            return description
 
-        _LOGGER.debug("Couldn't match description, %s, to region!", description)
-        return description
+        return region
 
     @staticmethod
     def country_from_region(region: str) -> str:
         """Resolve actual country from given region."""
-        _LOGGER.debug("Looking up country from region: %s", region)
-        for reg in REGIONS.items():
-            if reg[0] == region:
-                _LOGGER.debug(" - Found region in %s", reg[1][1])
-                return reg[1][1]
+        meta = _get_index().regions.get(region)
+        if meta is None:
+            _LOGGER.debug("Couldn't match region, %s, to country!", region)
+            return None
 
-        _LOGGER.debug("Couldn't match region, %s, to country!", region)
-        return None
+        return meta[1]
 
     @staticmethod
     def get_country_currency(country: str) -> dict:
         """Get official currency of country."""
-        for region in REGIONS.items():
-            if country == region[1][1]:
-                return region[1][0]
-
-        return None
+        regions = _get_index().country_regions.get(country)
+        return _get_index().regions[regions[0]][0] if regions else None
 
     @staticmethod
     def get_country_vat(country: str) -> float:
         """Get VAT amount for country."""
-        for region in REGIONS.items():
-            if country == region[1][1]:
-                return region[1][3]
-
-        return None
+        regions = _get_index().country_regions.get(country)
+        return _get_index().regions[regions[0]][3] if regions else None
 
     @property
     def country(self) -> str:
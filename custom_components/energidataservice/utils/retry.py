@@ -0,0 +1,106 @@
+"""Retry scheduling for failed updates."""
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+from random import uniform
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+_LOGGER = logging.getLogger(__name__)
+
+RETRY_BASE = timedelta(minutes=5)
+RETRY_CAP = timedelta(minutes=120)
+
+
+class RetryScheduler:
+    """Schedule retries with capped exponential backoff and full jitter.
+
+    There is at most one pending retry per key (region). Every entry waiting
+    on a key is updated when the retry fires.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        base: timedelta = RETRY_BASE,
+        cap: timedelta = RETRY_CAP,
+    ) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._base = base.total_seconds()
+        self._cap = cap.total_seconds()
+        self._pending = {}
+        self._attempts = {}
+        self._waiting = {}
+        self.scheduled = 0
+        self.fired = 0
+
+    def schedule(self, key: str, entry_id: str, action) -> None:
+        """Schedule a retry for key, unless one is already pending."""
+        self._waiting.setdefault(key, {})[entry_id] = action
+        if key in self._pending:
+            _LOGGER.debug("Retry for %s already pending", key)
+            return
+
+        attempt = self._attempts.get(key, 0)
+        self._attempts[key] = attempt + 1
+        self.scheduled += 1
+        delay = uniform(0, min(self._cap, self._base * 2**attempt))
+        _LOGGER.warning(
+            "Couldn't get data for %s, retrying in %s minutes.",
+            key,
+            round(delay / 60, 1),
+        )
+
+        @callback
+        def _fire(now) -> None:  # pylint: disable=unused-argument
+            """Run the pending retry for all waiting entries."""
+            self._pending.pop(key, None)
+            self.fired += 1
+            for retry in self._waiting.pop(key, {}).values():
+                self._hass.async_create_task(retry())
+
+        self._pending[key] = async_call_later(self._hass, delay, _fire)
+
+    def done(self, key: str, entry_id: str) -> None:
+        """Mark an entry as updated, cancelling the retry if nothing waits on it."""
+        waiting = self._waiting.get(key, {})
+        waiting.pop(entry_id, None)
+        if not waiting:
+            self.cancel(key)
+            self._attempts.pop(key, None)
+
+    def cancel(self, key: str) -> None:
+        """Cancel a pending retry."""
+        self._waiting.pop(key, None)
+        unsub = self._pending.pop(key, None)
+        if unsub:
+            _LOGGER.debug("Cancelled pending retry for %s", key)
+            unsub()
+
+    def remove(self, key: str, entry_id: str) -> None:
+        """Remove an unloaded entry, cancelling the retry if nothing waits on it."""
+        waiting = self._waiting.get(key, {})
+        waiting.pop(entry_id, None)
+        if not waiting:
+            self.cancel(key)
+
+    def attempts(self, key: str) -> int:
+        """Return number of retries scheduled for key since the last success."""
+        return self._attempts.get(key, 0)
+
+    def cancel_all(self) -> None:
+        """Cancel all pending retries."""
+        for key in list(self._pending):
+            self.cancel(key)
+
+    def as_dict(self) -> dict:
+        """Return counters and pending retries."""
+        return {
+            "scheduled": self.scheduled,
+            "fired": self.fired,
+            "pending": sorted(self._pending),
+            "attempts": dict(self._attempts),
+        }
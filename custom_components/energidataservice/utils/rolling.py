@@ -0,0 +1,132 @@
+"""Rolling multi-day price statistics."""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import date, timedelta
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RollingPrices:
+    """Hourly prices of the last days with incrementally updated aggregates.
+
+    Windows span calendar days, so a DST day of 23 or 25 hours counts as one
+    day. Adding a day updates the running sums in O(1) per price. The sorted
+    index behind percentile ranks is a plain list, so adding or dropping a
+    price is an O(n) move over at most days * 25 prices.
+    """
+
+    def __init__(self, days: int = 30, week_days: int = 7) -> None:
+        """Initialize the window."""
+        self._days = days
+        self._week_days = week_days
+        # (date, hourly prices, sum of prices), oldest first
+        self._window = deque()
+        self._sorted = []
+        self._sum = 0.0
+        self._count = 0
+        self.last_day = None
+
+    def _add(self, day: date, prices: list) -> None:
+        """Add the hourly prices of a day and drop days leaving the window."""
+        self._window.append((day, prices, sum(prices)))
+        self._sum += self._window[-1][2]
+        self._count += len(prices)
+        for price in prices:
+            insort(self._sorted, price)
+
+        first = day - timedelta(days=self._days - 1)
+        while self._window[0][0] < first:
+            _, leaving, total = self._window.popleft()
+            self._sum -= total
+            self._count -= len(leaving)
+            for price in leaving:
+                del self._sorted[bisect_left(self._sorted, price)]
+
+    def _week(self, weeks_back: int) -> tuple:
+        """Return sum and count of prices in a week, 0 being the latest."""
+        last = self._window[-1][0] - timedelta(days=weeks_back * self._week_days)
+        first = last - timedelta(days=self._week_days - 1)
+        total = count = 0
+        for day, prices, day_total in reversed(self._window):
+            if day < first:
+                break
+            if day <= last:
+                total += day_total
+                count += len(prices)
+
+        return total, count
+
+    def push_day(self, day: str, prices: list, per_hour: int = 1) -> bool:
+        """Add all prices of a completed day, unless already added.
+
+        Sub-hourly prices are averaged per hour, so every price weighs the
+        same in the window regardless of resolution.
+        """
+        if not prices or day == self.last_day:
+            return False
+
+        hourly = []
+        for i in range(0, len(prices), per_hour):
+            chunk = prices[i : i + per_hour]
+            hourly.append(sum(chunk) / len(chunk))
+
+        self._add(date.fromisoformat(day), hourly)
+        self.last_day = day
+        _LOGGER.debug("Added %s prices for %s to rolling statistics", len(prices), day)
+        return True
+
+    @property
+    def mean_week(self) -> float | None:
+        """Return rolling mean of the last week."""
+        if not self._window:
+            return None
+
+        total, count = self._week(0)
+        return total / count if count else None
+
+    @property
+    def mean(self) -> float | None:
+        """Return rolling mean of the whole window."""
+        return self._sum / self._count if self._count else None
+
+    @property
+    def week_over_week(self) -> float | None:
+        """Return relative change of the last week mean vs. the week before."""
+        if not self._window:
+            return None
+
+        total, count = self._week(0)
+        prev_total, prev_count = self._week(1)
+        if not count or not prev_count or not prev_total:
+            return None
+
+        mean, prev_mean = total / count, prev_total / prev_count
+        return (mean - prev_mean) / abs(prev_mean)
+
+    def percentile_rank(self, value: float) -> float | None:
+        """Return percentage of prices in the window lower than value."""
+        if value is None or not self._count:
+            return None
+
+        return bisect_left(self._sorted, value) / self._count * 100
+
+    def as_dict(self) -> dict:
+        """Return a serializable representation, oldest day first."""
+        return {
+            "last_day": self.last_day,
+            "days": [[day.isoformat(), prices] for day, prices, _ in self._window],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, days: int = 30, week_days: int = 7):
+        """Recreate the window from its serialized representation."""
+        rolling = cls(days, week_days)
+        data = data or {}
+        for day, prices in data.get("days") or []:
+            rolling._add(date.fromisoformat(day), prices)
+
+        rolling.last_day = data.get("last_day")
+        return rolling
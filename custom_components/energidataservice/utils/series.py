@@ -0,0 +1,174 @@
+"""Resolution aware price series."""
+from __future__ import annotations
+
+from calendar import timegm
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+from ..const import INTERVAL
+
+DEFAULT_RESOLUTION = timedelta(hours=1)
+MIN_RESOLUTION = timedelta(minutes=15)
+
+# A day is considered complete when at least this share of its intervals is known
+COMPLETE_DAY_RATIO = 20 / 24
+
+
+class PriceSeries(list):
+    """List of INTERVAL values that knows its own resolution."""
+
+    def __init__(self, data=(), resolution: timedelta = None) -> None:
+        """Initialize the series, detecting the resolution if not given."""
+        super().__init__(data)
+        self.resolution = resolution or detect_resolution(self)
+
+    @classmethod
+    def like(cls, other, data=()) -> PriceSeries:
+        """Create a new series with the resolution of another series."""
+        return cls(data, getattr(other, "resolution", None) or DEFAULT_RESOLUTION)
+
+    @property
+    def points_per_day(self) -> int:
+        """Return number of intervals in a regular day."""
+        return points_per_day(self.resolution)
+
+    @property
+    def complete(self) -> bool:
+        """Return True if the series covers (almost) an entire day."""
+        return len(self) > self.points_per_day * COMPLETE_DAY_RATIO
+
+    def price_at(self, when: datetime):
+        """Return the interval covering the given time.
+
+        Intervals are sorted and normally evenly spaced, so the position is
+        computed from the first start and checked. If intervals are missing
+        it falls back to a binary search.
+        """
+        if not self:
+            return None
+
+        start = floor_to_resolution(when, self.resolution).timestamp()
+        index = int(start - self[0].hour.timestamp()) // int(
+            self.resolution.total_seconds()
+        )
+        if 0 <= index < len(self) and self[index].hour.timestamp() == start:
+            return self[index]
+
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self[middle].hour.timestamp() < start:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < len(self) and self[low].hour.timestamp() == start:
+            return self[low]
+
+        return None
+
+
+def detect_resolution(data: list) -> timedelta:
+    """Detect resolution as the smallest spacing between consecutive intervals."""
+    resolution = None
+    for prev, cur in zip(data, data[1:]):
+        step = cur.hour - prev.hour
+        if step > timedelta(0) and (resolution is None or step < resolution):
+            resolution = step
+
+    return resolution or DEFAULT_RESOLUTION
+
+
+def points_per_day(resolution: timedelta) -> int:
+    """Return number of intervals of the given resolution in a regular day."""
+    return int(timedelta(days=1) / resolution)
+
+
+def floor_to_resolution(when: datetime, resolution: timedelta) -> datetime:
+    """Floor a datetime to the start of its interval."""
+    seconds = int(resolution.total_seconds())
+    return when.replace(microsecond=0) - timedelta(
+        seconds=int(when.timestamp()) % seconds
+    )
+
+
+def is_interval_boundary(when: datetime, resolution: timedelta) -> bool:
+    """Return True if the datetime is at the start of an interval."""
+    return int(when.timestamp()) % int(resolution.total_seconds()) < 60
+
+
+def parse_utc(value: str) -> int:
+    """Parse a UTC timestamp like 2022-03-25T00:00:00+00:00 to epoch seconds.
+
+    Values without an offset are taken as UTC. Anything not in that fixed
+    format falls back to datetime.fromisoformat.
+    """
+    if len(value) == 19 or value[19:] in ("+00:00", "Z"):
+        try:
+            return timegm(
+                (
+                    int(value[0:4]),
+                    int(value[5:7]),
+                    int(value[8:10]),
+                    int(value[11:13]),
+                    int(value[14:16]),
+                    int(value[17:19]),
+                )
+            )
+        except ValueError:
+            pass
+
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+
+    return int(parsed.timestamp())
+
+
+@lru_cache(maxsize=128)
+def day_bounds(tz: str, day: date) -> tuple:  # pylint: disable=invalid-name
+    """Return local midnight epochs at the start and end of a day.
+
+    The third element is the aware local midnight if the UTC offset is the
+    same for the whole day, so intervals can be derived by plain addition.
+    It is None on DST transition days.
+    """
+    import pytz  # pylint: disable=import-outside-toplevel
+
+    local_tz = pytz.timezone(tz)
+    start = local_tz.localize(datetime(day.year, day.month, day.day))
+    end = local_tz.localize(
+        datetime.combine(day + timedelta(days=1), datetime.min.time())
+    )
+    uniform = start if start.utcoffset() == end.utcoffset() else None
+    return int(start.timestamp()), int(end.timestamp()), uniform
+
+
+def split_days(
+    indata: list, tz: str, key: str = "HourUTC", value: str = "SpotPriceEUR"
+) -> dict:  # pylint: disable=invalid-name
+    """Split raw rows into PriceSeries per local day (YYYY-MM-DD).
+
+    Timestamps are parsed to integers once and bucketed by integer range checks
+    against cached local day boundaries and UTC offsets.
+    """
+    import pytz  # pylint: disable=import-outside-toplevel
+
+    local_tz = pytz.timezone(tz)
+    days = {}
+    start = end = None
+    for row in indata:
+        epoch = parse_utc(row[key])
+        if start is None or not start <= epoch < end:
+            day = datetime.fromtimestamp(epoch, local_tz).date()
+            start, end, midnight = day_bounds(tz, day)
+            bucket = days.setdefault(day.strftime("%Y-%m-%d"), [])
+
+        if midnight is not None:
+            when = midnight + timedelta(seconds=epoch - start)
+        else:
+            when = datetime.fromtimestamp(epoch, local_tz)
+
+        bucket.append(INTERVAL(row[value], when))
+
+    return {day: PriceSeries(rows) for day, rows in days.items()}
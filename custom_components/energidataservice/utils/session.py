@@ -0,0 +1,49 @@
+"""Dedicated HTTP session for connector I/O."""
+from __future__ import annotations
+
+import asyncio
+from collections import namedtuple
+import logging
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+SessionLimits = namedtuple(
+    "SessionLimits",
+    "connect_timeout read_timeout total_timeout limit limit_per_host dns_ttl keepalive",
+    defaults=(10, 30, 60, 16, 4, 600, 60),
+)
+
+
+class ConnectorError(Exception):
+    """Base of errors a connector raises when a source answers unusably."""
+
+
+# Errors a connector may raise on network trouble or a rejected request
+CONNECTOR_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, ConnectorError)
+
+
+def create_session(
+    limits: SessionLimits = SessionLimits(), **kwargs
+) -> aiohttp.ClientSession:
+    """Create a pooled session with explicit timeouts and connection limits.
+
+    Only two hosts are ever contacted, so a small per-host limit with long
+    keep-alive and DNS caching lets retries and polls reuse warm connections.
+    Must be called from within the event loop.
+    """
+    _LOGGER.debug("Creating HTTP session with %s", limits)
+    connector = aiohttp.TCPConnector(
+        limit=limits.limit,
+        limit_per_host=limits.limit_per_host,
+        use_dns_cache=True,
+        ttl_dns_cache=limits.dns_ttl,
+        keepalive_timeout=limits.keepalive,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=limits.total_timeout,
+        connect=limits.connect_timeout,
+        sock_read=limits.read_timeout,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, **kwargs)
@@ -0,0 +1,26 @@
+"""Command line access to the integration without Home Assistant.
+
+The integration package imports Home Assistant in its __init__, so it is
+registered here without running it. custom_components.energidataservice.
+connectors and friends then load under their own names, as in Home
+Assistant. Only modules free of Home Assistant imports can be used here.
+
+    python -m energidataservice --help
+"""
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+import sys
+
+INTEGRATION = "custom_components.energidataservice"
+INTEGRATION_PATH = (
+    Path(__file__).resolve().parent.parent / "custom_components" / "energidataservice"
+)
+
+if INTEGRATION not in sys.modules:
+    sys.modules[INTEGRATION] = module_from_spec(
+        spec_from_file_location(
+            INTEGRATION,
+            INTEGRATION_PATH / "__init__.py",
+            submodule_search_locations=[str(INTEGRATION_PATH)],
+        )
+    )
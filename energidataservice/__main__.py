@@ -0,0 +1,306 @@
+"""Fetch, parse and price spot prices for many regions without Home Assistant.
+
+Regions are fetched concurrently, each from the first connector returning
+prices, and written as rows with the raw EUR/MWh price and the price in the
+chosen currency and unit, with VAT if asked for. Run from the repository
+root:
+
+    python -m energidataservice DK1 DK2 SE3 --currency DKK --vat
+    python -m energidataservice all --format ndjson --output prices.ndjson
+    python -m energidataservice FI --format parquet -o fi.parquet
+    python -m energidataservice DK1 --replay test_dataset/20220325.json
+
+--replay answers the connectors from a recorded response file instead of
+the network, and writes all days it holds. Parquet output needs pyarrow.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+from datetime import datetime
+from importlib import import_module
+from importlib.util import find_spec
+import json
+import logging
+import os
+import sys
+import time
+
+from custom_components.energidataservice.connectors import Connectors
+from custom_components.energidataservice.const import REGIONS, UNIT_TO_MULTIPLIER
+from custom_components.energidataservice.utils.pricing import localize
+from custom_components.energidataservice.utils.regionhandler import RegionHandler
+from custom_components.energidataservice.utils.session import (
+    CONNECTOR_ERRORS,
+    ConnectorError,
+    SessionLimits,
+    create_session,
+)
+
+from . import INTEGRATION
+
+_LOGGER = logging.getLogger(__name__)
+
+FIELDS = ("region", "source", "start", "currency", "unit", "spot_eur_mwh", "price")
+FORMATS = ("csv", "ndjson", "parquet")
+
+
+class ReplayFile:
+    """Answer connector requests with a recorded response file.
+
+    The file holds an Energi Data Service GraphQL response, served to every
+    region, or a Nord Pool page 10 document, served as today's page. The
+    connector of the other source fails, so the regions fall through to the
+    connector the recording belongs to.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Load the recording."""
+        with open(path, "rb") as handle:
+            self._body = handle.read()
+
+        data = json.loads(self._body).get("data") or {}
+        if "elspotprices" in data:
+            self._method = "post"
+        elif "Rows" in data:
+            self._method = "get"
+        else:
+            raise ValueError(f"{path} is not a recorded response")
+
+    def _response(self, method: str, body: bytes = None):
+        """Return a response with body, or fail for the other source."""
+        if method != self._method:
+            raise ConnectorError("not in the recorded response")
+
+        return _Response(self._body if body is None else body)
+
+    def post(self, url, data=None, headers=None):  # pylint: disable=unused-argument
+        """Answer an Energi Data Service request."""
+        return self._response("post")
+
+    def get(self, url, headers=None):  # pylint: disable=unused-argument
+        """Answer a Nord Pool request, with no rows for other days than today."""
+        if datetime.now().strftime("%d-%m-%Y") in url:
+            return self._response("get")
+
+        return self._response("get", b'{"data": {"Rows": []}}')
+
+    async def close(self) -> None:
+        """Nothing to close, present like on a session."""
+
+
+class _Response:
+    """Successful response of a ReplayFile."""
+
+    status = 200
+    headers = {}
+
+    def __init__(self, body: bytes) -> None:
+        """Initialize the response."""
+        self._body = body
+
+    async def __aenter__(self) -> _Response:
+        """Enter the response like a request context."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Nothing to release."""
+
+    async def read(self) -> bytes:
+        """Return the body."""
+        return self._body
+
+
+async def fetch(region: str, client, tz: str, every_day: bool = False) -> tuple:
+    """Return source name and prices of region from the first connector with data.
+
+    Only today and tomorrow are returned, unless every_day is set.
+    """
+    handler = RegionHandler(region)
+    for endpoint in Connectors().get_connectors(handler.region):
+        module = import_module(endpoint.namespace, INTEGRATION)
+        api = module.Connector(handler, client, tz)
+        try:
+            await api.async_get_spotprices()
+        except CONNECTOR_ERRORS as err:
+            _LOGGER.warning("%s failed for %s: %r", endpoint.module, region, err)
+            continue
+
+        if every_day and api.days:
+            return module.SOURCE_NAME, [
+                interval for day in sorted(api.days) for interval in api.days[day]
+            ]
+        if api.today:
+            return module.SOURCE_NAME, list(api.today) + list(api.tomorrow or [])
+
+    _LOGGER.warning("No prices found for %s", region)
+    return None, []
+
+
+def price_rows(region: str, source: str, data: list, args) -> list:
+    """Return output rows for the prices of a region."""
+    handler = RegionHandler(region)
+    currency = args.currency or handler.currency.name
+    rate = 1.0
+    if currency != "EUR":
+        rate = handler.currency.convert(rate, currency)
+
+    vat = RegionHandler.get_country_vat(handler.country) if args.vat else 0
+    prices = localize(
+        [interval.price for interval in data],
+        rate,
+        args.unit,
+        vat,
+        args.cent,
+        args.decimals,
+    )
+    unit = f"{handler.currency.cent if args.cent else currency}/{args.unit}"
+    return [
+        {
+            "region": region,
+            "source": source,
+            "start": interval.hour.isoformat(),
+            "currency": currency,
+            "unit": unit,
+            "spot_eur_mwh": interval.price,
+            "price": price,
+        }
+        for interval, price in zip(data, prices)
+    ]
+
+
+class RowWriter:
+    """Write rows as CSV or NDJSON as they come, or collect them for Parquet."""
+
+    def __init__(self, fmt: str, output: str = None) -> None:
+        """Initialize the writer."""
+        self._format = fmt
+        self._output = output
+        self._rows = []
+        self._file = None
+        self._csv = None
+        self.count = 0
+        if fmt != "parquet":
+            self._file = (
+                open(output, "w", encoding="utf-8", newline="")
+                if output
+                else sys.stdout
+            )
+            if fmt == "csv":
+                self._csv = csv.DictWriter(self._file, FIELDS)
+                self._csv.writeheader()
+
+    def write(self, rows: list) -> None:
+        """Write rows of one region."""
+        self.count += len(rows)
+        if self._csv:
+            self._csv.writerows(rows)
+        elif self._file:
+            self._file.writelines(json.dumps(row) + "\n" for row in rows)
+        else:
+            self._rows += rows
+
+    def close(self) -> None:
+        """Flush and close the output."""
+        if self._format == "parquet":
+            import pyarrow  # pylint: disable=import-outside-toplevel
+            from pyarrow import parquet  # pylint: disable=import-outside-toplevel
+
+            parquet.write_table(pyarrow.Table.from_pylist(self._rows), self._output)
+        elif self._file is not sys.stdout:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+async def run(args, replay: ReplayFile = None) -> None:
+    """Fetch all regions and write their prices, from replay if given."""
+    writer = RowWriter(args.format, args.output)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    client = replay or create_session(SessionLimits(limit=args.concurrency))
+
+    async def fetch_region(region: str) -> tuple:
+        async with semaphore:
+            return region, *await fetch(
+                region, client, args.tz, every_day=replay is not None
+            )
+
+    start = time.perf_counter()
+    try:
+        for done in asyncio.as_completed([fetch_region(r) for r in args.regions]):
+            region, source, data = await done
+            writer.write(price_rows(region, source, data, args))
+    finally:
+        await client.close()
+        writer.close()
+
+    _LOGGER.info(
+        "%s rows for %s regions in %.2f s",
+        writer.count,
+        len(args.regions),
+        time.perf_counter() - start,
+    )
+
+
+def main() -> None:
+    """Parse arguments and run."""
+    parser = argparse.ArgumentParser(
+        prog="python -m energidataservice",
+        description=__doc__.splitlines()[0],
+    )
+    parser.add_argument("regions", nargs="+", help='region codes, or "all"')
+    parser.add_argument("--currency", help="currency (default: of the region)")
+    parser.add_argument("--vat", action="store_true", help="add VAT of the country")
+    parser.add_argument("--unit", choices=list(UNIT_TO_MULTIPLIER), default="kWh")
+    parser.add_argument("--cent", action="store_true", help="prices in cent")
+    parser.add_argument("--decimals", type=int, default=3)
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument(
+        "--replay", metavar="FILE", help="recorded response to use offline"
+    )
+    parser.add_argument("--tz", default="Europe/Copenhagen", help="local time zone")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(levelname)s %(name)s: %(message)s",
+    )
+    if not args.verbose:
+        logging.getLogger(INTEGRATION).setLevel(logging.WARNING)
+        _LOGGER.setLevel(logging.INFO)
+
+    connectors = Connectors().connectors
+    if args.regions == ["all"]:
+        served = set()
+        for connector in connectors:
+            served.update(connector.regions)
+        args.regions = sorted(region for region in REGIONS if region in served)
+
+    unknown = [region for region in args.regions if region not in REGIONS]
+    if unknown:
+        parser.error(f"unknown regions: {', '.join(unknown)}")
+    if args.format == "parquet" and not args.output:
+        parser.error("--format parquet needs --output")
+    if args.format == "parquet" and find_spec("pyarrow") is None:
+        parser.error("--format parquet needs pyarrow")
+
+    # The connectors pick today and tomorrow by the local time of the process
+    os.environ["TZ"] = args.tz
+    time.tzset()
+
+    replay = None
+    if args.replay:
+        try:
+            replay = ReplayFile(args.replay)
+        except (OSError, ValueError) as err:
+            parser.error(f"--replay: {err}")
+
+    asyncio.run(run(args, replay))
+
+
+if __name__ == "__main__":
+    main()